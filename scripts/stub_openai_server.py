@@ -0,0 +1,109 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint, with injectable latency.
+
+Usage:
+  python scripts/stub_openai_server.py --port 8765 --latency 0.5 --jitter 0.2
+  OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub \
+      python -m src.cli.main generate --count 50 --concurrency 16 --format json
+
+Every POST .../chat/completions sleeps latency (+ uniform jitter) seconds and
+answers with a short text derived from the prompt (a JSON object for
+json_schema requests), so responses differ per persona and the OpenAI cache
+does not short-circuit the run. With --max-rps, requests above that rate get
+a 429 with a Retry-After header.
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    jitter = 0.0
+    max_rps = 0.0
+    retry_after = 1.0
+    requests = 0
+    throttled = 0
+    window = []
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if not self.path.endswith('/chat/completions'):
+            self.send_error(404)
+            return
+        with StubHandler.lock:
+            StubHandler.requests += 1
+            now = time.monotonic()
+            StubHandler.window = [t for t in StubHandler.window if now - t < 1.0]
+            throttle = self.max_rps and len(StubHandler.window) >= self.max_rps
+            if throttle:
+                StubHandler.throttled += 1
+            else:
+                StubHandler.window.append(now)
+        if throttle:
+            payload = json.dumps({'error': {'message': 'Rate limit reached (stub)', 'type': 'requests',
+                                            'code': 'rate_limit_exceeded'}}).encode('utf-8')
+            self.send_response(429)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Retry-After', f"{self.retry_after:g}")
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        prompt = body.get('messages', [{}])[-1].get('content', '')
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        if (body.get('response_format') or {}).get('type') == 'json_schema':
+            content = json.dumps({
+                'summary': f"Stub summary {digest}.",
+                'skills': [f"Stub skill {digest}", 'Teamwork', 'Problem solving'],
+                'job_descriptions': [f"Stub job description {digest}."] * len(re.findall(r'^\d+\. ', prompt, re.M)),
+            })
+        else:
+            content = f"- Stub skill {digest}\n- Teamwork\n- Problem solving"
+        payload = json.dumps({
+            'id': f'chatcmpl-stub-{digest}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'stub'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds per request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra uniform random delay (seconds)')
+    parser.add_argument('--max-rps', type=float, default=0.0, help='Answer 429 above this many requests/second (0 = off)')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds sent with 429s')
+    args = parser.parse_args()
+    StubHandler.latency, StubHandler.jitter = args.latency, args.jitter
+    StubHandler.max_rps, StubHandler.retry_after = args.max_rps, args.retry_after
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Stub OpenAI server on http://{args.host}:{args.port}/v1 (latency {args.latency}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{StubHandler.requests} requests, {StubHandler.throttled} throttled")
+
+
+if __name__ == '__main__':
+    main()
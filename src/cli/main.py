@@ -1,18 +1,108 @@
+import asyncio
 import click
-from src.personas.persona_builder import build_persona
-from src.export.to_json import save_persona_json
-from src.export.to_pdf import render_cv_pdf
+from contextlib import nullcontext
 from pathlib import Path
 from rich.console import Console
 from rich.progress import Progress
 
 console = Console()
 
+def export_cv(persona, i, output_dir, format, verbose=False, renderer='classic', documents=None):
+    """
+    Write CV ``i`` as JSON and/or PDF into ``output_dir``.
+    
+    With a CVDocumentWriter as ``documents``, the PDF goes into its current
+    multi-CV document instead of a file of its own.
+    """
+    from src.export.to_json import save_persona_json
+    if renderer == 'fast':
+        from src.export.pdf_renderer_canvas import render_cv_canvas as render_cv_pdf
+    else:
+        from src.export.to_pdf import render_cv_pdf
+    
+    filename = f"{persona.first_name}_{persona.last_name}_{persona.canton}_{i}"
+    
+    if format in ['json', 'both']:
+        json_path = Path(output_dir) / f"{filename}.json"
+        save_persona_json(persona, str(json_path))
+        if verbose:
+            console.print(f"  ? Saved JSON: {json_path}")
+    
+    if format in ['pdf', 'both'] and documents is not None:
+        pdf_path, (first, last) = documents.add(persona, i, filename)
+        if verbose:
+            console.print(f"  ? Added to PDF: {pdf_path} (pages {first}-{last})")
+    elif format in ['pdf', 'both']:
+        pdf_path = Path(output_dir) / f"{filename}.pdf"
+        render_cv_pdf(persona, str(pdf_path))
+        if verbose:
+            console.print(f"  ? Saved PDF: {pdf_path}")
+
 @click.group()
 def cli():
     """Swiss CV Generator - Generate authentic Swiss CVs"""
     pass
 
+def check_canton(engine, canton, joint):
+    """Raise BadParameter unless ``canton`` has data (BFS tables in joint mode, data/cantons.json otherwise)"""
+    known = engine.joint_sampler.cantons if joint else engine.data.canton_codes
+    if canton not in known:
+        source = 'BFS population data' if joint else 'canton data'
+        raise click.BadParameter(f"no {source} for {canton!r}; available: {', '.join(sorted(known))}",
+                                 param_hint='--canton')
+
+def plan_skeletons(engine, count, canton, industry, seed, start_index, stratified, joint):
+    """
+    Sampled (not yet enriched) personas of a run, and its quota plan if stratified.
+    
+    The personas may be a lazy iterable.
+    """
+    from src.generation.seeding import persona_rng
+    
+    if stratified and start_index:
+        raise click.BadParameter('quota plans cover the whole run; use --start-index without --stratified',
+                                 param_hint='--start-index')
+    preferred_canton = None if canton == 'all' else canton
+    preferred_industry = None if industry == 'all' else industry
+    if stratified:
+        from src.generation.quotas import plan_quotas, default_canton_shares, generate_stratified
+        
+        if preferred_canton:
+            check_canton(engine, preferred_canton, joint)
+        cantons = [preferred_canton] if preferred_canton else None
+        plan = plan_quotas(count, default_canton_shares(engine, joint=joint, cantons=cantons))
+        return generate_stratified(engine, plan, seed=seed, preferred_industry=preferred_industry, joint=joint), plan
+    if joint:
+        if preferred_canton:
+            check_canton(engine, preferred_canton, joint=True)
+        return engine.sample_personas_range(start_index, start_index + count, seed,
+                                            preferred_canton=preferred_canton,
+                                            preferred_industry=preferred_industry, joint=True), None
+    return (
+        engine.sample_persona(preferred_canton, preferred_industry,
+                              rng=persona_rng(seed, i) if seed is not None else None)
+        for i in range(start_index, start_index + count)
+    ), None
+
+def pdf_documents(output_dir, format, cvs_per_pdf):
+    """CVDocumentWriter for --cvs-per-pdf, or a null context for one PDF per CV"""
+    if format == 'json' or cvs_per_pdf <= 1:
+        return nullcontext()
+    from src.export.pdf_renderer_canvas import CVDocumentWriter
+    
+    return CVDocumentWriter(output_dir, cvs_per_pdf)
+
+def variant_pool(variants, experience_bins):
+    """VariantPool for --variants/--experience-bins, or None without variants"""
+    if not variants:
+        return None
+    from src.generation.variants import VariantPool, parse_experience_bins
+    
+    try:
+        return VariantPool(variants, parse_experience_bins(experience_bins))
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--experience-bins')
+
 @cli.command()
 @click.option('--count', default=1, type=int, help='Number of CVs to generate')
 @click.option('--canton', default='all', help='Canton code (ZH, BE, GE, etc.) or "all"')
@@ -20,9 +110,37 @@ def cli():
 @click.option('--language', default='de', type=click.Choice(['de', 'fr', 'it']), help='Language')
 @click.option('--format', default='both', type=click.Choice(['json', 'pdf', 'both']), help='Output format')
 @click.option('--output-dir', default='output', help='Output directory path')
+@click.option('--renderer', default='classic', type=click.Choice(['classic', 'fast']),
+              help='PDF renderer: Platypus layout, or the same layout drawn directly on the canvas (faster)')
+@click.option('--cvs-per-pdf', default=1, type=click.IntRange(min=1),
+              help='Put up to N CVs in each PDF, with a page index next to it (fast renderer; 1 = one file per CV)')
 @click.option('--verbose', is_flag=True, help='Enable verbose logging')
-def generate(count, canton, industry, language, format, output_dir, verbose):
+@click.option('--stratified', is_flag=True, help='Exact canton/gender quotas instead of independent draws')
+@click.option('--joint', is_flag=True, help='Sample canton, gender, nationality and age from BFS tables')
+@click.option('--seed', default=None, type=int, help='Master seed; CV i is derived from (seed, i) and reproducible')
+@click.option('--start-index', default=0, type=int, help='Index of the first CV, to generate one shard of a seeded run')
+@click.option('--concurrency', default=8, type=click.IntRange(min=1), help='Max concurrent OpenAI requests (1 = sequential)')
+@click.option('--prompt-mode', default='combined', type=click.Choice(['combined', 'separate']),
+              help='One JSON request per CV (summary, skills, job descriptions) or separate summary/skills requests '
+                   '(use separate to reuse caches filled before the combined mode)')
+@click.option('--variants', default=0, type=click.IntRange(min=0),
+              help='Pre-generate K text variants per parameter bucket and sample among them (0 = per-CV prompts)')
+@click.option('--experience-bins', default='0-2,3-6,7-14,15-24,25+',
+              help='Experience ranges (years) that define variant buckets')
+@click.option('--rpm', default=None, type=float, help='Client-side limit on OpenAI requests per minute')
+@click.option('--tpm', default=None, type=float, help='Client-side limit on OpenAI tokens per minute')
+@click.option('--enrich', default='live', type=click.Choice(['live', 'batch', 'offline']),
+              help='Call OpenAI now, write a Batch API request file to finish later with "collect", '
+                   'or use the offline phrase banks only')
+@click.option('--batch-dir', default=None, help='Batch directory for --enrich batch (default: OUTPUT_DIR/batch)')
+def generate(count, canton, industry, language, format, output_dir, renderer, cvs_per_pdf, verbose, stratified, joint,
+             seed, start_index, concurrency, prompt_mode, variants, experience_bins, rpm, tpm, enrich, batch_dir):
     """Generate Swiss CVs with specified parameters"""
+    # Imported here so lightweight commands (validate) don't pay for the
+    # OpenAI client, ReportLab and the sampling engine on startup
+    from src.personas.persona_builder import enrich_persona, enrich_persona_offline, enrich_personas_async
+    from src.generation.sampling import get_engine
+    from src.generation import openai_client
     
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
@@ -31,46 +149,196 @@ def generate(count, canton, industry, language, format, output_dir, verbose):
     console.print(f"  Industry: {industry}")
     console.print(f"  Language: {language}")
     console.print(f"  Format: {format}")
+    if format != 'json':
+        console.print(f"  Renderer: {renderer}" if cvs_per_pdf == 1 else f"  PDFs: {cvs_per_pdf} CVs per file")
     console.print(f"  Output: {output_dir}")
     console.print()
     
-    with Progress() as progress:
+    if rpm is not None or tpm is not None:
+        openai_client.configure_rate_limits(rpm or openai_client.RATE_LIMIT_RPM, tpm or openai_client.RATE_LIMIT_TPM)
+    combined = prompt_mode == 'combined'
+    skeletons, plan = plan_skeletons(get_engine(), count, canton, industry, seed, start_index, stratified, joint)
+    pool = variant_pool(variants, experience_bins) if enrich != 'offline' else None
+    if pool is not None or enrich == 'batch':
+        skeletons = list(skeletons)
+    
+    if enrich == 'batch':
+        from src.generation.batch import write_batch
+        from src.personas.persona_builder import pending_requests
+        
+        requests = pending_requests(skeletons, combined, pool)
+        batch_dir = batch_dir or str(Path(output_dir) / 'batch')
+        manifest = write_batch(batch_dir, list(enumerate(skeletons, start_index)), requests, {
+            'output_dir': output_dir, 'format': format, 'renderer': renderer, 'cvs_per_pdf': cvs_per_pdf,
+            'prompt_mode': prompt_mode,
+            'variants': variants, 'experience_bins': experience_bins, 'model': openai_client.DEFAULT_MODEL,
+        })
+        console.print(f"[green]? Wrote {manifest['requests']} batch requests for {manifest['personas']} CVs "
+                      f"to {batch_dir}[/green]")
+        console.print(f"  Submit {Path(batch_dir) / 'requests.jsonl'} to the Batch API, then run:")
+        console.print(f"  python -m src.cli.main collect {batch_dir} <results.jsonl>")
+        return
+    
+    if pool is not None:
+        buckets = len({pool.bucket(p) for p in skeletons})
+        console.print(f"[cyan]Pre-generating {variants} variants for {buckets} buckets[/cyan]")
+        generated = pool.pregenerate(skeletons, concurrency, combined)
+        console.print(f"  ? {generated} new variants requested")
+    
+    with Progress() as progress, pdf_documents(output_dir, format, cvs_per_pdf) as documents:
         task = progress.add_task("[cyan]Generating CVs...", total=count)
         
-        for i in range(count):
+        def write(i, persona, error):
             try:
-                preferred_canton = None if canton == 'all' else canton
-                preferred_industry = None if industry == 'all' else industry
-                
-                persona = build_persona(
-                    preferred_canton=preferred_canton,
-                    preferred_industry=preferred_industry,
-                    
-                )
-                
-                filename = f"{persona.first_name}_{persona.last_name}_{persona.canton}_{i}"
-                
-                if format in ['json', 'both']:
-                    json_path = Path(output_dir) / f"{filename}.json"
-                    save_persona_json(persona, str(json_path))
-                    if verbose:
-                        console.print(f"  ? Saved JSON: {json_path}")
-                
-                if format in ['pdf', 'both']:
-                    pdf_path = Path(output_dir) / f"{filename}.pdf"
-                    render_cv_pdf(persona, str(pdf_path))
-                    if verbose:
-                        console.print(f"  ? Saved PDF: {pdf_path}")
-                
+                if error is not None:
+                    raise error
+                export_cv(persona, i, output_dir, format, verbose, renderer, documents)
                 progress.update(task, advance=1)
                 
             except Exception as e:
                 console.print(f"[red]? Error generating CV {i}: {str(e)[:100]}[/red]")
                 if verbose:
                     raise
+        
+        if enrich == 'offline':
+            for k, skeleton in enumerate(skeletons):
+                write(start_index + k, enrich_persona_offline(skeleton), None)
+        elif concurrency > 1:
+            # Enrichment requests overlap; CVs are still written in index order
+            async def run():
+                async for k, persona, error in enrich_personas_async(skeletons, concurrency, combined, pool):
+                    write(start_index + k, persona, error)
+            
+            asyncio.run(run())
+        else:
+            for k, skeleton in enumerate(skeletons):
+                try:
+                    persona, error = enrich_persona(skeleton, combined, pool), None
+                except Exception as e:
+                    persona, error = None, e
+                write(start_index + k, persona, error)
     
     console.print(f"\n[green]? Generation complete! ({count} CVs)[/green]")
     console.print(f"  Output: {Path(output_dir).absolute()}")
+    
+    from src.generation.openai_client import cache_stats
+    
+    tiers = {tier: stats for tier, stats in cache_stats().items() if stats['hits'] or stats['misses']}
+    if tiers:
+        from rich.table import Table
+        
+        table = Table(title="Response cache")
+        for column in ('Tier', 'Hits', 'Misses', 'Hit rate'):
+            table.add_column(column, justify='left' if column == 'Tier' else 'right')
+        for tier, stats in tiers.items():
+            table.add_row(tier, str(stats['hits']), str(stats['misses']), f"{stats['hit_rate']:.1%}")
+        console.print(table)
+    
+    if plan is not None:
+        from rich.table import Table
+        from src.generation.quotas import quota_report
+        
+        table = Table(title="Quota report")
+        for column in ('Dimension', 'Value', 'Target', 'Achieved', 'Target %', 'Achieved %'):
+            table.add_column(column, justify='left' if column in ('Dimension', 'Value') else 'right')
+        for row in quota_report(plan, skeletons):
+            table.add_row(row['dimension'], row['value'], str(row['target_count']), str(row['achieved_count']),
+                          f"{row['target_share']:.2%}", f"{row['achieved_share']:.2%}")
+        console.print(table)
+
+@cli.command('warm-cache')
+@click.option('--count', default=1, type=int, help='Number of CVs of the planned run')
+@click.option('--canton', default='all', help='Canton code (ZH, BE, GE, etc.) or "all"')
+@click.option('--industry', default='all', help='Industry (technology, finance, healthcare, etc.)')
+@click.option('--stratified', is_flag=True, help='As for generate')
+@click.option('--joint', is_flag=True, help='As for generate')
+@click.option('--seed', default=None, type=int, help='Master seed of the planned run (needed to warm its exact prompts)')
+@click.option('--start-index', default=0, type=int, help='Index of the first CV')
+@click.option('--prompt-mode', default='combined', type=click.Choice(['combined', 'separate']), help='As for generate')
+@click.option('--variants', default=0, type=click.IntRange(min=0), help='As for generate')
+@click.option('--experience-bins', default='0-2,3-6,7-14,15-24,25+', help='As for generate')
+@click.option('--concurrency', default=64, type=click.IntRange(min=1), help='Max concurrent OpenAI requests')
+@click.option('--rpm', default=None, type=float, help='Client-side limit on OpenAI requests per minute')
+@click.option('--tpm', default=None, type=float, help='Client-side limit on OpenAI tokens per minute')
+@click.option('--dry-run', is_flag=True, help='Only count the prompts that are not cached yet')
+def warm_cache(count, canton, industry, stratified, joint, seed, start_index, prompt_mode, variants, experience_bins,
+               concurrency, rpm, tpm, dry_run):
+    """Fill the response cache with every prompt a generate run with these options will send"""
+    from src.personas.persona_builder import pending_requests, prefetch_async
+    from src.generation.sampling import get_engine
+    from src.generation import openai_client
+    
+    if seed is None:
+        console.print("[yellow]  Without --seed the run samples different CVs; only shared prompts will hit[/yellow]")
+    if rpm is not None or tpm is not None:
+        openai_client.configure_rate_limits(rpm or openai_client.RATE_LIMIT_RPM, tpm or openai_client.RATE_LIMIT_TPM)
+    skeletons, _ = plan_skeletons(get_engine(), count, canton, industry, seed, start_index, stratified, joint)
+    requests = pending_requests(skeletons, prompt_mode == 'combined', variant_pool(variants, experience_bins))
+    console.print(f"[cyan]{len(requests)} uncached prompts for {count} CVs[/cyan]")
+    if dry_run or not requests:
+        return
+    
+    with Progress() as progress:
+        task = progress.add_task("[cyan]Warming cache...", total=len(requests))
+        async def warm():
+            try:
+                await prefetch_async(requests, concurrency, lambda: progress.update(task, advance=1))
+            finally:
+                await openai_client.aclose_async_client()
+        
+        asyncio.run(warm())
+    console.print(f"[green]? Cached responses for {len(requests)} prompts[/green]")
+
+@cli.command()
+@click.argument('batch_dir', type=click.Path(exists=True, file_okay=False))
+@click.argument('results_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output-dir', default=None, help='Output directory (default: the one the batch was written for)')
+@click.option('--format', default=None, type=click.Choice(['json', 'pdf', 'both']), help='Output format (default: as in the batch)')
+@click.option('--renderer', default=None, type=click.Choice(['classic', 'fast']), help='PDF renderer (default: as in the batch)')
+@click.option('--cvs-per-pdf', default=None, type=click.IntRange(min=1), help='CVs per PDF (default: as in the batch)')
+@click.option('--verbose', is_flag=True, help='Enable verbose logging')
+def collect(batch_dir, results_file, output_dir, format, renderer, cvs_per_pdf, verbose):
+    """Load Batch API results into the response cache and render the batch's CVs"""
+    from src.generation.batch import complete_persona, ingest_results, load_manifest, load_personas
+    
+    try:
+        manifest = load_manifest(batch_dir)
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e))
+    output_dir = output_dir or manifest['output_dir']
+    format = format or manifest['format']
+    renderer = renderer or manifest.get('renderer', 'classic')
+    cvs_per_pdf = cvs_per_pdf or manifest.get('cvs_per_pdf', 1)
+    combined = manifest['prompt_mode'] == 'combined'
+    pool = None
+    if manifest.get('variants'):
+        from src.generation.variants import VariantPool, parse_experience_bins
+        
+        pool = VariantPool(manifest['variants'], parse_experience_bins(manifest['experience_bins']))
+    
+    counts = ingest_results(results_file)
+    console.print(f"  ? Cached {counts['stored']} results ({counts['failed']} failed)")
+    
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    missing = written = 0
+    with Progress() as progress, pdf_documents(output_dir, format, cvs_per_pdf) as documents:
+        task = progress.add_task("[cyan]Rendering CVs...", total=manifest['personas'])
+        for i, skeleton in load_personas(batch_dir):
+            try:
+                persona, misses = complete_persona(skeleton, combined, pool)
+                export_cv(persona, i, output_dir, format, verbose, renderer, documents)
+                missing += misses
+                written += 1
+            except Exception as e:
+                console.print(f"[red]? Error rendering CV {i}: {str(e)[:100]}[/red]")
+                if verbose:
+                    raise
+            progress.update(task, advance=1)
+    
+    if missing:
+        console.print(f"[yellow]  {missing} requests had no result; those fields use local fallbacks[/yellow]")
+    console.print(f"\n[green]? Collection complete! ({written} CVs)[/green]")
+    console.print(f"  Output: {Path(output_dir).absolute()}")
 
 @cli.command()
 def validate():
@@ -100,5 +368,36 @@ def validate():
     else:
         console.print("\n[red]? Some files are missing. Check setup.[/red]")
 
+@cli.command('compile-data')
+@click.option('--data-dir', default='data', help='Data directory to compile')
+def compile_data(data_dir):
+    """Compile data files into a binary bundle for fast engine start"""
+    from src.data.bundle import compile_bundle
+    
+    path = compile_bundle(data_dir)
+    size_kb = Path(path).stat().st_size / 1024
+    console.print(f"[green]? Compiled {data_dir} -> {path} ({size_kb:.1f} KB)[/green]")
+
+@cli.command('compact-cache')
+@click.option('--max-entries', default=None, type=int, help='Evict least-recently-used entries above this count')
+@click.option('--max-mb', default=None, type=float, help='Evict least-recently-used entries above this size (MB)')
+@click.option('--import-legacy', is_flag=True, help='First copy entries from the old JSON cache directory')
+def compact_cache(max_entries, max_mb, import_legacy):
+    """Evict, checkpoint and vacuum the OpenAI response cache"""
+    from src.generation.openai_client import CACHE_DIR, get_cache
+    
+    cache = get_cache()
+    if import_legacy:
+        imported = cache.import_json_dir(CACHE_DIR)
+        console.print(f"  ? Imported {imported} entries from {CACHE_DIR}")
+    if max_entries is not None or max_mb is not None:
+        evicted = cache.evict(max_entries=max_entries,
+                              max_bytes=int(max_mb * 1024 * 1024) if max_mb is not None else None)
+        console.print(f"  ? Evicted {evicted} entries")
+    stats = cache.compact()
+    console.print(f"[green]? Compacted {cache.path}: {stats['entries']} entries, "
+                  f"{stats['bytes'] / 1024:.1f} KB of responses, {stats['hits']} hits, "
+                  f"file {stats['file_bytes'] / 1024:.1f} KB[/green]")
+
 if __name__ == '__main__':
     cli()
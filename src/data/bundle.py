@@ -0,0 +1,205 @@
+"""Compiled binary bundle of the data/ directory
+
+Parsing cantons.json, companies.json, occupations.json and the name CSVs on
+every engine start is the bulk of startup time with full BFS name lists and a
+real company registry. ``compile_bundle`` writes everything ``SwissData`` holds
+into one uncompressed NumPy ``.npz`` file: integer/weight columns plus a single
+UTF-8 string table that all text columns index into.
+
+The bundle records size, mtime and SHA-256 of every source file. It is used
+only while it is fresh: matching size and mtime are trusted as-is, otherwise
+the content hash decides (so a fresh checkout with new mtimes still hits).
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.data.loader import (
+    DATA_FILES, NAME_FILES, SwissData, load_swiss_data, data_file_paths,
+)
+from src.data.models import CantonInfo, OccupationCategory, Language
+from src.utils import gc_paused
+
+# 2: canton populations derived from cantons.json weights
+BUNDLE_VERSION = 2
+BUNDLE_DIR = '.cache'
+BUNDLE_NAME = 'swiss_data.npz'
+
+
+def bundle_path(data_dir: str = 'data') -> str:
+    """Default bundle location for ``data_dir``"""
+    return os.path.join(data_dir, BUNDLE_DIR, BUNDLE_NAME)
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_manifest(data_dir: str = 'data') -> Dict[str, Optional[Dict]]:
+    """Size, mtime and content hash of each source file (None if missing)"""
+    manifest = {}
+    for fname, path in zip(DATA_FILES, data_file_paths(data_dir)):
+        try:
+            st = os.stat(path)
+        except OSError:
+            manifest[fname] = None
+            continue
+        manifest[fname] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': file_sha256(path)}
+    return manifest
+
+
+def _is_fresh(stored: Dict[str, Optional[Dict]], data_dir: str) -> bool:
+    for fname, path in zip(DATA_FILES, data_file_paths(data_dir)):
+        entry = stored.get(fname)
+        try:
+            st = os.stat(path)
+        except OSError:
+            if entry is not None:
+                return False
+            continue
+        if entry is None:
+            return False
+        if entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            continue
+        if entry['size'] != st.st_size or entry['sha256'] != file_sha256(path):
+            return False
+    return True
+
+
+class _StringTable:
+    def __init__(self):
+        self.strings: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        i = self.index.get(value)
+        if i is None:
+            i = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return i
+
+    def column(self, values) -> np.ndarray:
+        return np.fromiter((self.add(v) for v in values), dtype=np.int32)
+
+    def blob(self) -> np.ndarray:
+        return np.frombuffer('\x00'.join(self.strings).encode('utf-8'), dtype=np.uint8)
+
+
+def compile_bundle(data_dir: str = 'data', path: Optional[str] = None, data: Optional[SwissData] = None,
+                   manifest: Optional[Dict] = None) -> str:
+    """
+    Parse the source files (or use an already loaded ``data``) and write the bundle.
+
+    ``manifest`` should be taken before ``data`` was loaded, so a source edited
+    in between makes the bundle stale rather than silently wrong.
+
+    Returns:
+        Path of the written bundle
+    """
+    if manifest is None:
+        manifest = source_manifest(data_dir)
+    if data is None:
+        data = load_swiss_data(data_dir)
+    path = path or bundle_path(data_dir)
+
+    st = _StringTable()
+    cantons = list(data.cantons.values())
+    arrays = {
+        'canton_code': st.column(c.code for c in cantons),
+        'canton_name': st.column(c.name for c in cantons),
+        'canton_population': np.array([c.population for c in cantons], dtype=np.int64),
+        'canton_workforce': np.array([-1 if c.workforce is None else c.workforce for c in cantons], dtype=np.int64),
+        'canton_language': st.column(c.primary_language.value for c in cantons),
+    }
+    for name, values in zip(('company_name', 'company_canton', 'company_industry', 'company_size_band'),
+                            data.company_columns):
+        arrays[name] = st.column(values)
+    for key, (names, weights) in data.names.items():
+        arrays[f'names_{key}'] = st.column(names)
+        arrays[f'weights_{key}'] = np.array(weights, dtype=np.int64)
+    occupations = [occ.model_dump() for occ in data.occupations.values()]
+    header = {'version': BUNDLE_VERSION, 'sources': manifest, 'occupations': occupations}
+    arrays['header'] = np.frombuffer(json.dumps(header, ensure_ascii=False).encode('utf-8'), dtype=np.uint8)
+    arrays['strings'] = st.blob()
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+    return path
+
+
+def load_bundle(data_dir: str = 'data', path: Optional[str] = None, check_fresh: bool = True) -> Optional[SwissData]:
+    """
+    Load SwissData from the compiled bundle.
+
+    Returns None if the bundle is missing, unreadable, from another bundle
+    version or (with ``check_fresh``) older than the source files.
+    """
+    path = path or bundle_path(data_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            header = json.loads(z['header'].tobytes().decode('utf-8'))
+            if header.get('version') != BUNDLE_VERSION:
+                return None
+            if check_fresh and not _is_fresh(header['sources'], data_dir):
+                return None
+            arrays = {k: z[k] for k in z.files}
+    except Exception as e:
+        print(f"Warning: Error loading data bundle {path}: {e}")
+        return None
+
+    # Only acyclic lists of strings/ints are allocated below; pausing the cyclic
+    # GC avoids repeated full scans while millions of them are created
+    with gc_paused():
+        strings = arrays['strings'].tobytes().decode('utf-8').split('\x00')
+
+        def col(name):
+            return [strings[i] if i >= 0 else None for i in arrays[name].tolist()]
+
+        cantons = {}
+        for code, name, pop, wf, lang in zip(col('canton_code'), col('canton_name'), arrays['canton_population'].tolist(),
+                                             arrays['canton_workforce'].tolist(), col('canton_language')):
+            cantons[code] = CantonInfo.model_construct(
+                code=code, name=name, population=pop, workforce=None if wf < 0 else wf, primary_language=Language(lang))
+        company_columns = tuple(col(name) for name in
+                                ('company_name', 'company_canton', 'company_industry', 'company_size_band'))
+        occupations = {}
+        for raw in header['occupations']:
+            occ = OccupationCategory.model_construct(**raw)
+            occupations[occ.code] = occ
+        names = {key: (col(f'names_{key}'), arrays[f'weights_{key}'].tolist()) for key in NAME_FILES}
+    return SwissData(cantons, None, occupations, names, company_columns=company_columns)
+
+
+def load_swiss_data_cached(data_dir: str = 'data', compile: bool = True) -> SwissData:
+    """
+    Load SwissData from a fresh bundle, else from the source files.
+
+    With ``compile`` a stale or missing bundle is rewritten after parsing, so
+    the next process (e.g. the next worker) starts from the bundle.
+    """
+    data = load_bundle(data_dir)
+    if data is not None:
+        return data
+    manifest = source_manifest(data_dir) if compile else None
+    data = load_swiss_data(data_dir)
+    if compile:
+        try:
+            compile_bundle(data_dir, data=data, manifest=manifest)
+        except OSError as e:
+            print(f"Warning: Could not write data bundle for {data_dir}: {e}")
+    return data
@@ -0,0 +1,109 @@
+"""Population tables derived from the BFS demographic balance cube
+
+Turns ``data/bfs_demographic_balance_by_canton_1971_2023.csv`` (PC-Axis, see
+src/data/pcaxis.py) into a canton x sex x nationality population table for a
+given year, with cantons keyed by their two-letter code.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.data.pcaxis import PxCube, load_px
+
+DEMOGRAPHICS_FILE = 'bfs_demographic_balance_by_canton_1971_2023.csv'
+
+# BFS canton label -> (code, primary language)
+BFS_CANTONS: Dict[str, Tuple[str, str]] = {
+    'Zürich': ('ZH', 'de'),
+    'Bern / Berne': ('BE', 'de'),
+    'Luzern': ('LU', 'de'),
+    'Uri': ('UR', 'de'),
+    'Schwyz': ('SZ', 'de'),
+    'Obwalden': ('OW', 'de'),
+    'Nidwalden': ('NW', 'de'),
+    'Glarus': ('GL', 'de'),
+    'Zug': ('ZG', 'de'),
+    'Fribourg / Freiburg': ('FR', 'fr'),
+    'Solothurn': ('SO', 'de'),
+    'Basel-Stadt': ('BS', 'de'),
+    'Basel-Landschaft': ('BL', 'de'),
+    'Schaffhausen': ('SH', 'de'),
+    'Appenzell Ausserrhoden': ('AR', 'de'),
+    'Appenzell Innerrhoden': ('AI', 'de'),
+    'St. Gallen': ('SG', 'de'),
+    'Graubünden / Grigioni / Grischun': ('GR', 'de'),
+    'Aargau': ('AG', 'de'),
+    'Thurgau': ('TG', 'de'),
+    'Ticino': ('TI', 'it'),
+    'Vaud': ('VD', 'fr'),
+    'Valais / Wallis': ('VS', 'fr'),
+    'Neuchâtel': ('NE', 'fr'),
+    'Genève': ('GE', 'fr'),
+    'Jura': ('JU', 'fr'),
+}
+CANTON_LANGUAGES: Dict[str, str] = {code: lang for code, lang in BFS_CANTONS.values()}
+
+SEXES = ['male', 'female']
+NATIONALITIES = ['CH', 'foreign']
+
+# Axis and value labels of the German-language cube
+_AXIS_YEAR = 'Jahr'
+_AXIS_CANTON = 'Kanton'
+_AXIS_NATIONALITY = 'Staatsangehörigkeit (Kategorie)'
+_AXIS_SEX = 'Geschlecht'
+_AXIS_COMPONENT = 'Demografische Komponente'
+_POPULATION_END_OF_YEAR = 'Bestand am 31. Dezember'
+_SEX_LABELS = ['Mann', 'Frau']
+_NATIONALITY_LABELS = ['Schweiz', 'Ausland']
+
+
+class PopulationTable:
+    """
+    Permanent resident population by canton, sex and nationality for one year.
+
+    Attributes:
+        year: Reference year (population on 31 December)
+        cantons: Canton codes, aligned with axis 0 of ``counts``
+        sexes: SEXES, aligned with axis 1
+        nationalities: NATIONALITIES, aligned with axis 2
+        counts: int64 array of shape (cantons, sexes, nationalities)
+    """
+
+    def __init__(self, year: str, cantons: List[str], counts: np.ndarray):
+        self.year = year
+        self.cantons = cantons
+        self.sexes = list(SEXES)
+        self.nationalities = list(NATIONALITIES)
+        self.counts = counts
+
+    def canton_weights(self) -> Dict[str, int]:
+        """Total population per canton code"""
+        return dict(zip(self.cantons, self.counts.sum(axis=(1, 2)).tolist()))
+
+
+def population_table(cube: PxCube, year: Optional[str] = None) -> PopulationTable:
+    """
+    Extract the canton x sex x nationality population for ``year`` (default: latest).
+    """
+    years = cube.labels[_AXIS_YEAR]
+    year = str(year) if year is not None else years[-1]
+    if year not in years:
+        raise ValueError(f"Year {year} not in BFS cube ({years[0]}-{years[-1]})")
+    labels = [label for label in cube.labels[_AXIS_CANTON] if label in BFS_CANTONS]
+    sub = cube.sel(**{
+        _AXIS_YEAR: year,
+        _AXIS_COMPONENT: _POPULATION_END_OF_YEAR,
+        _AXIS_CANTON: labels,
+        _AXIS_SEX: _SEX_LABELS,
+        _AXIS_NATIONALITY: _NATIONALITY_LABELS,
+    })
+    # sel keeps the cube's axis order: canton, nationality, sex
+    counts = np.nan_to_num(sub.values).transpose(0, 2, 1).astype(np.int64)
+    return PopulationTable(year, [BFS_CANTONS[label][0] for label in labels], counts)
+
+
+def load_population_table(data_dir: str = 'data', year: Optional[str] = None) -> PopulationTable:
+    """Load the BFS cube from ``data_dir`` (cached, see load_px) and extract ``year``"""
+    return population_table(load_px(os.path.join(data_dir, DEMOGRAPHICS_FILE)), year)
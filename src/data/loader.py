@@ -3,7 +3,24 @@
 import json
 import csv
 import os
-from typing import List, Dict, Any
+import re
+from typing import List, Dict, Any, Tuple, Optional
+
+from src.data.models import CantonInfo, CompanyInfo, OccupationCategory, Language
+
+LANGUAGES = ['de', 'fr', 'it']
+DEFAULT_CANTON_POPULATION = 50000
+# Relative canton weights (cantons.json "weight") become populations on this scale
+WEIGHT_POPULATION_SCALE = 1_000_000
+PRIMARY_LANGUAGE_SHARE = 0.9
+SECONDARY_LANGUAGE_SHARE = 0.05
+NAME_FILES = {
+    'surnames': 'surnames.csv',
+    'de': 'names_de.csv',
+    'fr': 'names_fr.csv',
+    'it': 'names_it.csv',
+}
+DATA_FILES = ['cantons.json', 'companies.json', 'occupations.json'] + list(NAME_FILES.values())
 
 
 def load_cantons_json(path: str = 'data/cantons.json') -> List[Dict]:
@@ -107,3 +124,187 @@ def load_cantons_csv(*args, **kwargs):
 def load_companies_csv(*args, **kwargs):
     """Deprecated: Use load_companies_json instead"""
     return load_companies_json(*args, **kwargs)
+
+
+def load_name_csv(path: str) -> Tuple[List[str], List[int]]:
+    """Load names and their frequency weights from CSV file"""
+    names, weights = [], []
+    if not os.path.exists(path):
+        return names, weights
+    with open(path, newline='', encoding='utf-8') as fh:
+        reader = csv.DictReader(fh)
+        for r in reader:
+            nm = r.get('name') or r.get('Name') or r.get('vorname') or next(iter(r.values()))
+            freq = r.get('frequency') or r.get('freq') or r.get('anzahl') or r.get('count') or '1'
+            try:
+                w = int(freq)
+            except:
+                w = 1
+            names.append(nm)
+            weights.append(w)
+    return names, weights
+
+
+# Normalization into the typed models of src.data.models
+
+def _read_records(path: str, key_field: str) -> List[Dict]:
+    """Read a JSON list, or a dict keyed by code, into a list of dicts"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        if len(data) == 1 and isinstance(next(iter(data.values())), list):
+            # {"occupations": [...]} style wrapper
+            return next(iter(data.values()))
+        # {"ZH": {...}} style: the key is the code
+        return [{key_field: k, **v} for k, v in data.items() if isinstance(v, dict)]
+    return data if isinstance(data, list) else []
+
+
+def _slug(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', text.casefold()).strip('_')
+
+
+def _canton_population(raw: Dict) -> int:
+    if raw.get('population'):
+        return int(raw['population'])
+    if raw.get('weight') is not None:
+        return round(float(raw['weight']) * WEIGHT_POPULATION_SCALE)
+    return DEFAULT_CANTON_POPULATION
+
+
+def normalize_canton(raw: Dict) -> CantonInfo:
+    """Normalize a raw canton record into CantonInfo; a relative ``weight`` stands in for the population"""
+    if not raw.get('code'):
+        raise ValueError(f"Canton record without a code: {raw!r}")
+    lang = raw.get('primary_language') or raw.get('language') or 'de'
+    if lang not in Language.__members__:
+        lang = 'de'
+    return CantonInfo(
+        code=raw['code'],
+        name=raw.get('name') or raw['code'],
+        population=_canton_population(raw),
+        workforce=raw.get('workforce'),
+        primary_language=lang,
+    )
+
+
+def normalize_company(raw: Dict, canton_codes: Optional[Dict[str, str]] = None) -> CompanyInfo:
+    """Normalize a raw company record; canton names are mapped to codes"""
+    canton = raw.get('canton') or ''
+    if canton_codes:
+        canton = canton_codes.get(canton.casefold(), canton)
+    return CompanyInfo(
+        name=raw.get('name') or '',
+        canton=canton,
+        industry=raw.get('industry') or '',
+        size_band=raw.get('size_band'),
+    )
+
+
+def normalize_occupation(raw: Dict) -> OccupationCategory:
+    """Normalize a raw occupation record; a plain title is used for all languages"""
+    title = raw.get('title') or ''
+    if not isinstance(title, dict):
+        title = {lang: title for lang in LANGUAGES}
+    code = raw.get('code') or _slug(next(iter(title.values()), ''))
+    return OccupationCategory(code=code, title=title, industry=raw.get('industry') or '')
+
+
+def load_cantons(path: str = 'data/cantons.json') -> Dict[str, CantonInfo]:
+    """Load cantons as a code-keyed map of CantonInfo"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Cantons data not found at {path}")
+    cantons = {}
+    for raw in _read_records(path, 'code'):
+        canton = normalize_canton(raw)
+        cantons[canton.code] = canton
+    return cantons
+
+
+def load_companies(path: str = 'data/companies.json', cantons: Optional[Dict[str, CantonInfo]] = None) -> List[CompanyInfo]:
+    """Load companies as CompanyInfo, with canton names resolved via ``cantons``"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Companies data not found at {path}")
+    canton_codes = {}
+    for c in (cantons or {}).values():
+        canton_codes[c.name.casefold()] = c.code
+        canton_codes[c.code.casefold()] = c.code
+    return [normalize_company(raw, canton_codes) for raw in _read_records(path, 'name')]
+
+
+def load_occupations(path: str = 'data/occupations.json') -> Dict[str, OccupationCategory]:
+    """Load occupations as a code-keyed map of OccupationCategory"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Occupations data not found at {path}")
+    occupations = {}
+    for raw in _read_records(path, 'code'):
+        occ = normalize_occupation(raw)
+        occupations[occ.code] = occ
+    return occupations
+
+
+def canton_language_probs(canton: CantonInfo) -> Tuple[List[str], List[float]]:
+    """Language distribution for a canton: primary language first, then the others"""
+    primary = canton.primary_language.value
+    langs = [primary] + [l for l in LANGUAGES if l != primary]
+    probs = [PRIMARY_LANGUAGE_SHARE] + [SECONDARY_LANGUAGE_SHARE] * (len(langs) - 1)
+    return langs, probs
+
+
+class SwissData:
+    """
+    Canonical, typed view of the data/ directory.
+
+    Everything the sampler needs per persona is precomputed here: code-keyed
+    canton/occupation maps, canton weights aligned with ``canton_codes`` and
+    per-canton language probability vectors.
+
+    Companies are also kept column-wise (name, canton, industry, size_band);
+    when built from columns only, the CompanyInfo list is created on first access.
+    """
+
+    def __init__(self, cantons: Dict[str, CantonInfo], companies: Optional[List[CompanyInfo]],
+                 occupations: Dict[str, OccupationCategory], names: Dict[str, Tuple[List[str], List[int]]],
+                 company_columns: Optional[Tuple[List[str], List[str], List[str], List[Optional[str]]]] = None):
+        self.cantons = cantons
+        self._companies = companies
+        if company_columns is None:
+            company_columns = (
+                [c.name for c in companies],
+                [c.canton for c in companies],
+                [c.industry for c in companies],
+                [c.size_band for c in companies],
+            )
+        self.company_columns = company_columns
+        self.occupations = occupations
+        self.names = {key: names.get(key, ([], [])) for key in NAME_FILES}
+        self.canton_codes = list(cantons)
+        self.canton_weights = [c.population for c in cantons.values()]
+        self.language_probs = {code: canton_language_probs(c) for code, c in cantons.items()}
+
+    @property
+    def companies(self) -> List[CompanyInfo]:
+        if self._companies is None:
+            self._companies = [
+                CompanyInfo.model_construct(name=name, canton=canton, industry=industry, size_band=band)
+                for name, canton, industry, band in zip(*self.company_columns)
+            ]
+        return self._companies
+
+
+def data_file_paths(data_dir: str = 'data') -> List[str]:
+    """Paths of all source data files read by load_swiss_data"""
+    return [os.path.join(data_dir, fname) for fname in DATA_FILES]
+
+
+def load_swiss_data(data_dir: str = 'data') -> SwissData:
+    """Load and normalize all data files in ``data_dir``"""
+    cantons = load_cantons(os.path.join(data_dir, 'cantons.json'))
+    companies = load_companies(os.path.join(data_dir, 'companies.json'), cantons)
+    try:
+        occupations = load_occupations(os.path.join(data_dir, 'occupations.json'))
+    except Exception as e:
+        print(f"Warning: Error loading occupations from {data_dir}: {e}")
+        occupations = {}
+    names = {key: load_name_csv(os.path.join(data_dir, fname)) for key, fname in NAME_FILES.items()}
+    return SwissData(cantons, companies, occupations, names)
@@ -35,6 +35,7 @@ class SwissPersona(BaseModel):
     age: int
     birth_year: int
     gender: Optional[str]
+    nationality: Optional[str] = None  # 'CH' / 'foreign' when sampled from BFS tables
     experience_years: float
     industry: str
     current_title: str
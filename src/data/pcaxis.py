@@ -0,0 +1,285 @@
+"""Streaming PC-Axis (.px) parser for BFS/STAT-TAB tables
+
+BFS distributes its cubes as PC-Axis files (``data/bfs_demographic_balance_by_canton_1971_2023.csv``
+is one, despite the extension): ``KEYWORD[lang]("variable")=value;`` metadata
+followed by a ``DATA=`` block of whitespace-separated cells. ``parse_px`` reads
+the file line by line, keeps the metadata for one language and fills the DATA
+block straight into a preallocated NumPy array shaped ``STUB + HEADING``.
+
+``load_px`` caches the parsed cube as ``.npz`` next to the source (in a
+``.cache`` directory), keyed by the source's SHA-256, so later loads skip the
+text parsing entirely. Writing a new cache file removes the ones of older
+versions of the source.
+"""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from src.data.bundle import file_sha256
+
+PX_CACHE_DIR = '.cache'
+
+# Cells that are not numbers ("..", "...", "-", confidential markers) become NaN
+_MISSING = float('nan')
+_KEY_RE = re.compile(r'^(?P<key>[A-Z0-9-]+)(?:\[(?P<lang>[a-z]{2})\])?(?:\("(?P<sub>[^"]*)"\))?$')
+
+
+class PxCube:
+    """
+    N-dimensional PC-Axis table with labelled axes.
+
+    Attributes:
+        axes: Variable names, STUB first then HEADING (the array's axis order)
+        labels: Variable name -> list of value labels
+        codes: Variable name -> list of value codes (labels when the file has no CODES)
+        values: float64 array of shape ``[len(labels[a]) for a in axes]``
+        meta: Remaining scalar metadata (TITLE, UNITS, SOURCE, ...)
+    """
+
+    def __init__(self, axes: List[str], labels: Dict[str, List[str]], codes: Dict[str, List[str]],
+                 values: np.ndarray, meta: Dict[str, Union[str, List[str]]]):
+        self.axes = axes
+        self.labels = labels
+        self.codes = codes
+        self.values = values
+        self.meta = meta
+
+    def __repr__(self):
+        dims = ', '.join(f"{a}={len(self.labels[a])}" for a in self.axes)
+        return f"PxCube({dims})"
+
+    def axis(self, name: str) -> int:
+        """Position of the variable ``name`` in ``values``"""
+        return self.axes.index(name)
+
+    def index(self, axis: str, label: str) -> int:
+        """Position of ``label`` (or code) along ``axis``"""
+        labels = self.labels[axis]
+        if label in labels:
+            return labels.index(label)
+        return self.codes[axis].index(label)
+
+    def sel(self, **selection) -> 'PxCube':
+        """
+        Select along axes by label; a single label drops the axis, a list keeps it.
+
+        Axis names containing spaces can be passed via ``cube.sel(**{"Geschlecht": "Frau"})``.
+        """
+        index = [slice(None)] * len(self.axes)
+        axes, labels, codes = [], {}, {}
+        for i, name in enumerate(self.axes):
+            if name not in selection:
+                axes.append(name)
+                labels[name], codes[name] = self.labels[name], self.codes[name]
+                continue
+            wanted = selection[name]
+            if isinstance(wanted, str):
+                index[i] = self.index(name, wanted)
+                continue
+            positions = [self.index(name, w) for w in wanted]
+            index[i] = positions
+            axes.append(name)
+            labels[name] = [self.labels[name][p] for p in positions]
+            codes[name] = [self.codes[name][p] for p in positions]
+        # Apply list selections one axis at a time (NumPy would broadcast them together)
+        values = self.values[tuple(i if not isinstance(i, list) else slice(None) for i in index)]
+        kept = 0
+        for i in index:
+            if isinstance(i, list):
+                values = np.take(values, i, axis=kept)
+            if not isinstance(i, int):
+                kept += 1
+        return PxCube(axes, labels, codes, values, self.meta)
+
+
+def _detect_encoding(path: str) -> str:
+    with open(path, 'rb') as f:
+        head = f.read(4096)
+    if head.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    m = re.search(rb'CODEPAGE="([^"]+)"', head)
+    return m.group(1).decode('ascii') if m else 'iso-8859-15'
+
+
+def _split_values(text: str) -> List[str]:
+    """Split a metadata value: quoted strings (concatenated across lines) or bare tokens"""
+    if '"' not in text:
+        return [t.strip() for t in text.split(',') if t.strip()]
+    parts = re.findall(r'"((?:[^"]|"")*)"|(,)', text.replace('"\n"', '').replace('""', '\x00'))
+    values, current = [], None
+    for quoted, comma in parts:
+        if comma:
+            values.append(current or '')
+            current = None
+        else:
+            current = (current or '') + quoted.replace('\x00', '"')
+    if current is not None:
+        values.append(current)
+    return values
+
+
+def _statements(lines):
+    """Yield complete ``KEY=value`` metadata statements until the DATA keyword"""
+    buf = []
+    in_quotes = False
+    for line in lines:
+        stripped = line.rstrip('\r\n')
+        if not buf and stripped.startswith('DATA='):
+            yield 'DATA', stripped[len('DATA='):]
+            return
+        start = 0
+        for i, ch in enumerate(stripped):
+            if ch == '"':
+                in_quotes = not in_quotes
+            elif ch == ';' and not in_quotes:
+                buf.append(stripped[start:i])
+                yield 'STMT', '\n'.join(buf)
+                buf = []
+                start = i + 1
+        rest = stripped[start:]
+        if rest.strip():
+            buf.append(rest)
+
+
+def parse_px(path: str, language: Optional[str] = None) -> PxCube:
+    """
+    Parse a PC-Axis file into a PxCube.
+
+    Args:
+        path: Path to the .px file
+        language: Metadata language (e.g. 'en'); default is the file's main LANGUAGE
+
+    Returns:
+        PxCube with values shaped STUB + HEADING
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"PC-Axis file not found at {path}")
+
+    meta: Dict[str, Union[str, List[str]]] = {}
+    labels: Dict[str, List[str]] = {}
+    codes: Dict[str, List[str]] = {}
+    localized: Dict[str, Dict] = {'STUB': {}, 'HEADING': {}, 'VALUES': {}, 'CODES': {}, 'ELIMINATION': {}}
+
+    with open(path, 'r', encoding=_detect_encoding(path)) as fh:
+        data_head = None
+        for kind, stmt in _statements(fh):
+            if kind == 'DATA':
+                data_head = stmt
+                break
+            key, _, value = stmt.partition('=')
+            m = _KEY_RE.match(key.strip())
+            if not m:
+                continue
+            key, lang, sub = m.group('key'), m.group('lang'), m.group('sub')
+            values = _split_values(value)
+            if key in localized:
+                localized[key].setdefault(lang, {})[sub] = values
+            elif lang is None and sub is None:
+                meta[key] = values[0] if len(values) == 1 else values
+
+        if data_head is None:
+            raise ValueError(f"No DATA block in {path}")
+
+        # Metadata for the requested language; translated axis names map
+        # positionally onto the default-language STUB/HEADING
+        lang = None if language in (None, meta.get('LANGUAGE')) else language
+        if lang is not None and lang not in localized['STUB']:
+            raise ValueError(f"Language {language!r} not in {path}")
+        default_axes = localized['STUB'][None].get(None, []) + localized['HEADING'][None].get(None, [])
+        axes = localized['STUB'][lang].get(None, []) + localized['HEADING'][lang].get(None, [])
+        for name, default_name in zip(axes, default_axes):
+            labels[name] = localized['VALUES'][lang][name]
+            default_codes = localized['CODES'].get(None, {}).get(default_name)
+            codes[name] = localized['CODES'].get(lang, {}).get(name) or default_codes or labels[name]
+        eliminations = localized['ELIMINATION'].get(lang, {})
+        meta['ELIMINATION'] = {name: eliminations[name][0] for name in axes if eliminations.get(name)}
+
+        shape = tuple(len(labels[a]) for a in axes)
+        values = np.empty(int(np.prod(shape)), dtype=np.float64)
+        pos = 0
+        line = data_head
+        done = False
+        while not done:
+            if ';' in line:
+                line = line[:line.index(';')]
+                done = True
+            tokens = line.split()
+            if pos + len(tokens) > values.size:
+                raise ValueError(f"DATA block in {path} has more than the {values.size} cells of its STUB/HEADING")
+            for token in tokens:
+                try:
+                    values[pos] = float(token)
+                except ValueError:
+                    values[pos] = _MISSING
+                pos += 1
+            if not done:
+                line = fh.readline()
+                if not line:
+                    break
+
+    if pos != values.size:
+        raise ValueError(f"DATA block in {path} has {pos} cells, expected {values.size}")
+    return PxCube(axes, labels, codes, values.reshape(shape), meta)
+
+
+def px_cache_path(path: str, language: Optional[str] = None, digest: Optional[str] = None) -> str:
+    """Cache file for the parsed cube of ``path`` (keyed by content hash and language)"""
+    digest = digest or file_sha256(path)
+    base = os.path.basename(path)
+    suffix = f".{language}" if language else ''
+    return os.path.join(os.path.dirname(path), PX_CACHE_DIR, f"{base}.{digest[:16]}{suffix}.npz")
+
+
+def load_px(path: str, language: Optional[str] = None, use_cache: bool = True) -> PxCube:
+    """
+    Load a PC-Axis cube, from the on-disk cache when the source is unchanged.
+
+    The first load parses the file and writes the cache; later loads read the
+    ``.npz`` directly.
+    """
+    if not use_cache:
+        return parse_px(path, language)
+    cache_path = px_cache_path(path, language)
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as z:
+                header = json.loads(z['header'].tobytes().decode('utf-8'))
+                return PxCube(header['axes'], header['labels'], header['codes'], z['values'], header['meta'])
+        except Exception as e:
+            print(f"Warning: Error loading PC-Axis cache {cache_path}: {e}")
+    cube = parse_px(path, language)
+    header = {'axes': cube.axes, 'labels': cube.labels, 'codes': cube.codes, 'meta': cube.meta}
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, values=cube.values,
+                     header=np.frombuffer(json.dumps(header, ensure_ascii=False).encode('utf-8'), dtype=np.uint8))
+        os.replace(tmp, cache_path)
+        _remove_stale_caches(cache_path, path, language)
+    except OSError as e:
+        print(f"Warning: Could not write PC-Axis cache {cache_path}: {e}")
+    return cube
+
+
+def _remove_stale_caches(cache_path: str, path: str, language: Optional[str]):
+    """Delete cache files of ``path`` and ``language`` other than ``cache_path`` (older source digests)"""
+    cache_dir = os.path.dirname(cache_path)
+    suffix = f".{language}" if language else ''
+    pattern = re.compile(rf"{re.escape(os.path.basename(path))}\.[0-9a-f]{{16}}{re.escape(suffix)}\.npz")
+    for name in os.listdir(cache_dir):
+        stale = os.path.join(cache_dir, name)
+        if pattern.fullmatch(name) and stale != cache_path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass  # e.g. still open in another process; it is just never read again
+
+
+def total_label(cube: PxCube, axis: str) -> Optional[str]:
+    """Label of the ELIMINATION (total) value of ``axis``, if the file declares one"""
+    return cube.meta.get('ELIMINATION', {}).get(axis)
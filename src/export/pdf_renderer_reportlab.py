@@ -6,49 +6,57 @@ Refined ReportLab PDF renderer with improved visual design:
 - Thin dividers between experience roles
 - Timeline dot + vertical connector for experience entries
 - Optional Inter fonts from assets/fonts/Inter-*.ttf (fallback: Helvetica)
+
+Styles, colors and labels come from the shared "refined" theme (theme.py),
+built once per language and process.
 """
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Frame, PageTemplate, FrameBreak,
     Table, TableStyle, Flowable, KeepTogether
 )
-from reportlab.pdfbase import ttfonts, pdfmetrics
-from reportlab.lib.colors import HexColor
 from typing import Any, Optional
 import datetime
 import os
 
+from src.export.theme import REFINED_COLORS, get_theme
+
 # ---------- Config knobs ----------
-ACCENT = "#0050A4"   # accent color
-FONT_DIR = os.path.join(os.getcwd(), "assets", "fonts")  # put Inter-Regular.ttf / Inter-Bold.ttf here
-FONT_REGULAR = "Inter"
-FONT_BOLD = "Inter-Bold"
+# Colors (accent, divider) are set in theme.REFINED_COLORS
 RIGHT_COL_WIDTH = 58 * mm
 DIVIDER_THICKNESS = 0.4
 # -----------------------------------
 
-def _register_fonts():
-    """Register Inter fonts if present, otherwise fall back to Helvetica."""
-    try:
-        reg = {}
-        reg[FONT_REGULAR] = os.path.join(FONT_DIR, "Inter-Regular.ttf")
-        reg[FONT_BOLD] = os.path.join(FONT_DIR, "Inter-Bold.ttf")
-        any_reg = False
-        for name, path in reg.items():
-            if os.path.exists(path):
-                pdfmetrics.registerFont(ttfonts.TTFont(name, path))
-                any_reg = True
-        if any_reg:
-            return FONT_REGULAR, FONT_BOLD
-    except Exception:
-        pass
-    return "Helvetica", "Helvetica-Bold"
-
-FONT_REGULAR_USED, FONT_BOLD_USED = _register_fonts()
+ACCENT_COLOR = REFINED_COLORS['accent']
+DIVIDER_COLOR = REFINED_COLORS['divider']
+
+# Table styles shared by every render
+CONTACT_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), ACCENT_COLOR),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+    ("TOPPADDING", (0, 0), (-1, -1), 6),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+])
+PHOTO_TABLE_STYLE = TableStyle([
+    ("BOX", (0, 0), (-1, -1), 0.6, REFINED_COLORS['photo_box']),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+])
+SKILLS_TABLE_STYLE = TableStyle([("LEFTPADDING", (0, 0), (-1, -1), 0), ("RIGHTPADDING", (0, 0), (-1, -1), 6)])
+EXPERIENCE_TABLE_STYLE = TableStyle([
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("LEFTPADDING", (0,0), (0, -1), 0),
+    ("RIGHTPADDING", (0,0), (0, -1), 6),
+    ("LEFTPADDING", (1,0), (1, -1), 0),
+])
+DOT_TABLE_STYLE = TableStyle([("LEFTPADDING", (0,0), (-1,-1), 0), ("RIGHTPADDING", (0,0), (-1,-1), 0)])
 
 def _get(p: Any, key: str, default: Optional[str] = "") -> str:
     if p is None:
@@ -58,7 +66,7 @@ def _get(p: Any, key: str, default: Optional[str] = "") -> str:
     return getattr(p, key, default) or default
 
 class ThinDivider(Flowable):
-    def __init__(self, width, thickness=DIVIDER_THICKNESS, color=HexColor("#E6E9EC")):
+    def __init__(self, width, thickness=DIVIDER_THICKNESS, color=DIVIDER_COLOR):
         Flowable.__init__(self)
         self.width = width
         self.thickness = thickness
@@ -75,7 +83,7 @@ class TimelineDot(Flowable):
     Draw a small dot and optional vertical connector for timeline visual.
     width param is unused but kept for compatibility with Flowable sizing APIs.
     """
-    def __init__(self, dot_diameter=4, connector_height=18, connector_color=HexColor("#E6E9EC")):
+    def __init__(self, dot_diameter=4, connector_height=18, connector_color=DIVIDER_COLOR):
         Flowable.__init__(self)
         self.dot_diameter = dot_diameter
         self.connector_height = connector_height
@@ -89,21 +97,13 @@ class TimelineDot(Flowable):
         x = radius
         y = self.height - radius
         # dot (filled)
-        c.setFillColor(HexColor(ACCENT))
+        c.setFillColor(ACCENT_COLOR)
         c.circle(x, y, radius, stroke=0, fill=1)
         # connector line below dot
         c.setStrokeColor(self.connector_color)
         c.setLineWidth(1)
         c.line(x, y - radius, x, y - radius - (self.connector_height - radius))
 
-def _labels_for_lang(lang: str):
-    mapping = {
-        "de": {"profile": "Profil", "experience": "Berufserfahrung", "education": "Ausbildung", "skills": "Skills", "languages": "Sprachen", "contact": "Kontakt"},
-        "fr": {"profile": "Profil", "experience": "Expérience", "education": "Formation", "skills": "Compétences", "languages": "Langues", "contact": "Contact"},
-        "it": {"profile": "Profilo", "experience": "Esperienza", "education": "Formazione", "skills": "Competenze", "languages": "Lingue", "contact": "Contatto"},
-    }
-    return mapping.get((lang or "de").lower()[:2], mapping["de"])
-
 def render_persona_pdf(persona: Any, out_path: str):
     PAGE_SIZE = A4
     PAGE_WIDTH, PAGE_HEIGHT = PAGE_SIZE
@@ -111,58 +111,13 @@ def render_persona_pdf(persona: Any, out_path: str):
     GUTTER = 8 * mm
     LEFT_COL_WIDTH = PAGE_WIDTH - 2 * MARGIN - RIGHT_COL_WIDTH - GUTTER
 
-    base = getSampleStyleSheet()
-    style_name = ParagraphStyle(
-        "Name",
-        parent=base["Heading1"],
-        fontName=FONT_BOLD_USED,
-        fontSize=26,
-        leading=28,
-        spaceAfter=4,
-        textColor=HexColor(ACCENT),
-    )
-    style_meta = ParagraphStyle(
-        "Meta",
-        parent=base["Normal"],
-        fontName=FONT_REGULAR_USED,
-        fontSize=9,
-        leading=11,
-        textColor=HexColor("#555555"),
-        spaceAfter=6,
-    )
-    style_h = ParagraphStyle(
-        "H",
-        parent=base["Heading3"],
-        fontName=FONT_BOLD_USED,
-        fontSize=11,
-        spaceBefore=6,
-        spaceAfter=6,
-        textColor=HexColor(ACCENT)
-    )
-    style_normal = ParagraphStyle(
-        "Body",
-        parent=base["BodyText"],
-        fontName=FONT_REGULAR_USED,
-        fontSize=10,
-        leading=13,
-        spaceAfter=4
-    )
-    style_small = ParagraphStyle(
-        "Small",
-        parent=base["Normal"],
-        fontName=FONT_REGULAR_USED,
-        fontSize=8,
-        leading=10,
-        textColor=HexColor("#777777")
-    )
-    style_bullet = ParagraphStyle(
-        "Bullet",
-        parent=base["Normal"],
-        fontName=FONT_REGULAR_USED,
-        fontSize=9.2,
-        leftIndent=6,
-        leading=12,
-    )
+    theme = get_theme(_get(persona, "language") or "de", "refined")
+    style_name = theme.styles["name"]
+    style_meta = theme.styles["meta"]
+    style_h = theme.styles["h"]
+    style_normal = theme.styles["normal"]
+    style_small = theme.styles["small"]
+    style_bullet = theme.styles["bullet"]
 
     doc = SimpleDocTemplate(out_path, pagesize=PAGE_SIZE,
                             leftMargin=MARGIN, rightMargin=MARGIN,
@@ -180,6 +135,7 @@ def render_persona_pdf(persona: Any, out_path: str):
     age = _get(persona, "age") or ""
     contact_email = _get(persona, "email") or ""
     contact_phone = _get(persona, "phone") or ""
+    labels = theme.labels
 
     flow.append(Paragraph(name, style_name))
     meta_parts = []
@@ -188,7 +144,7 @@ def render_persona_pdf(persona: Any, out_path: str):
     if language:
         meta_parts.append(str(language))
     if age:
-        meta_parts.append(f"{age} Jahre")
+        meta_parts.append(labels["age"].format(age=age))
     meta = " • ".join(meta_parts)
     if meta:
         flow.append(Paragraph(meta, style_meta))
@@ -199,7 +155,6 @@ def render_persona_pdf(persona: Any, out_path: str):
 
     # Summary
     summary = _get(persona, "summary") or _get(persona, "profil") or ""
-    labels = _labels_for_lang(language or "de")
     if summary:
         flow.append(Paragraph(labels["profile"], style_h))
         flow.append(Paragraph(summary, style_normal))
@@ -223,19 +178,12 @@ def render_persona_pdf(persona: Any, out_path: str):
     if canton:
         facts.append(f"{canton}")
     if age:
-        facts.append(f"{age} Jahre")
+        facts.append(labels["age"].format(age=age))
     if facts:
         contact_items.append([Paragraph(" • ".join(facts), style_small)])
 
     contact_tbl = Table(contact_items, colWidths=[RIGHT_COL_WIDTH - 8])
-    contact_tbl.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), HexColor(ACCENT)),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-        ("TOPPADDING", (0, 0), (-1, -1), 6),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-    ]))
+    contact_tbl.setStyle(CONTACT_TABLE_STYLE)
     right_flow.append(contact_tbl)
     right_flow.append(Spacer(1, 8))
 
@@ -247,14 +195,8 @@ def render_persona_pdf(persona: Any, out_path: str):
         right_flow.append(img)
         right_flow.append(Spacer(1, 8))
     else:
-        ph = Table([[Paragraph("Foto", style_small)]], colWidths=[RIGHT_COL_WIDTH - 12], rowHeights=[(RIGHT_COL_WIDTH - 12) * 0.55])
-        ph.setStyle(TableStyle([
-            ("BOX", (0, 0), (-1, -1), 0.6, HexColor("#d0d3d6")),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("LEFTPADDING", (0, 0), (-1, -1), 6),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-        ]))
+        ph = Table([[Paragraph(labels["photo"], style_small)]], colWidths=[RIGHT_COL_WIDTH - 12], rowHeights=[(RIGHT_COL_WIDTH - 12) * 0.55])
+        ph.setStyle(PHOTO_TABLE_STYLE)
         right_flow.append(ph)
         right_flow.append(Spacer(1, 8))
 
@@ -276,7 +218,7 @@ def render_persona_pdf(persona: Any, out_path: str):
             row.append(Paragraph("", style_bullet))
             data.append(row)
         tbl = Table(data, colWidths=[(RIGHT_COL_WIDTH - 12)/2, (RIGHT_COL_WIDTH - 12)/2])
-        tbl.setStyle(TableStyle([("LEFTPADDING", (0, 0), (-1, -1), 0), ("RIGHTPADDING", (0, 0), (-1, -1), 6)]))
+        tbl.setStyle(SKILLS_TABLE_STYLE)
         right_flow.append(tbl)
         right_flow.append(Spacer(1, 6))
 
@@ -293,7 +235,7 @@ def render_persona_pdf(persona: Any, out_path: str):
     # timestamp
     gen_ts = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
     right_flow.append(Spacer(1, 6))
-    right_flow.append(Paragraph(f"Generiert: {gen_ts}", style_small))
+    right_flow.append(Paragraph(labels["generated"].format(timestamp=gen_ts), style_small))
 
     flow.extend(right_flow)
     flow.append(FrameBreak())
@@ -321,12 +263,7 @@ def render_persona_pdf(persona: Any, out_path: str):
             content_par = Paragraph(f"<b>{title}</b><br/><i>{comp}</i>", style_normal)
 
             tbl = Table([[date_par, content_par]], colWidths=[date_col_width, content_col_width])
-            tbl.setStyle(TableStyle([
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("LEFTPADDING", (0,0), (0, -1), 0),
-                ("RIGHTPADDING", (0,0), (0, -1), 6),
-                ("LEFTPADDING", (1,0), (1, -1), 0),
-            ]))
+            tbl.setStyle(EXPERIENCE_TABLE_STYLE)
             # KeepTogether to avoid awkward breaks between title and bullets
             flow.append(KeepTogether([tbl]))
 
@@ -351,7 +288,7 @@ def render_persona_pdf(persona: Any, out_path: str):
             # This is a pragmatic approach to ensure the dot is vertically aligned.
             dot = TimelineDot(dot_diameter=4, connector_height=14)
             dot_tbl = Table([[dot, ""]], colWidths=[12, LEFT_COL_WIDTH - 12])
-            dot_tbl.setStyle(TableStyle([("LEFTPADDING", (0,0), (-1,-1), 0), ("RIGHTPADDING", (0,0), (-1,-1), 0)]))
+            dot_tbl.setStyle(DOT_TABLE_STYLE)
             flow.append(dot_tbl)
             flow.append(Spacer(1, 2))
 
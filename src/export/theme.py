@@ -0,0 +1,179 @@
+# src/export/theme.py
+"""
+Per-process PDF themes: paragraph styles, colors, fonts and labels.
+
+Building a stylesheet is pure setup work, so each (language, layout) theme is
+built once and shared by every render in the process. Themes are frozen and
+their mappings read-only; renderers must not modify the styles either, as
+other renders share them.
+
+Layouts:
+- classic: two-column table with a grey sidebar (to_pdf.render_cv_pdf, and
+  pdf_renderer_canvas.render_cv_canvas without Platypus)
+- refined: text column plus contact card column (pdf_renderer_reportlab)
+"""
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from reportlab.lib import colors
+from reportlab.lib.colors import Color, HexColor
+from reportlab.lib.enums import TA_LEFT
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics, ttfonts
+
+LAYOUTS = ('classic', 'refined')
+LANGUAGES = ('de', 'fr', 'it')
+DEFAULT_LANGUAGE = 'de'
+
+# Optional Inter fonts for the refined layout (assets/fonts/Inter-*.ttf)
+FONT_DIR = os.path.join(os.getcwd(), "assets", "fonts")
+FONT_REGULAR = "Inter"
+FONT_BOLD = "Inter-Bold"
+
+
+def _register_fonts():
+    """Register Inter fonts if present, otherwise fall back to Helvetica."""
+    try:
+        reg = {}
+        reg[FONT_REGULAR] = os.path.join(FONT_DIR, "Inter-Regular.ttf")
+        reg[FONT_BOLD] = os.path.join(FONT_DIR, "Inter-Bold.ttf")
+        any_reg = False
+        for name, path in reg.items():
+            if os.path.exists(path):
+                pdfmetrics.registerFont(ttfonts.TTFont(name, path))
+                any_reg = True
+        if any_reg:
+            return FONT_REGULAR, FONT_BOLD
+    except Exception:
+        pass
+    return "Helvetica", "Helvetica-Bold"
+
+
+FONT_REGULAR_USED, FONT_BOLD_USED = _register_fonts()
+
+CLASSIC_COLORS = {
+    'primary': HexColor('#2C3E50'),
+    'accent': HexColor('#3498DB'),
+    'sidebar': HexColor('#ECF0F1'),
+    'text': HexColor('#2C3E50'),
+    'light': HexColor('#7F8C8D'),
+    'white': colors.white,
+}
+
+REFINED_COLORS = {
+    'accent': HexColor('#0050A4'),
+    'meta': HexColor('#555555'),
+    'small': HexColor('#777777'),
+    'divider': HexColor('#E6E9EC'),
+    'photo_box': HexColor('#d0d3d6'),
+    'white': colors.white,
+}
+
+CLASSIC_LABELS = {
+    'de': {
+        'contact': 'KONTAKT', 'languages': 'SPRACHEN', 'skills': 'KOMPETENZEN',
+        'profile': 'PROFESSIONELLES PROFIL', 'experience': 'BERUFSERFAHRUNG', 'education': 'AUSBILDUNG',
+        'age': '{age} Jahre', 'canton': 'Kanton {canton}', 'native': '{language} - Muttersprache',
+        'english': 'Englisch - Flüssig', 'degree': '{degree} in {field}',
+        'de': 'Deutsch', 'fr': 'Franzoesisch', 'it': 'Italienisch', 'en': 'Englisch',
+    },
+    'fr': {
+        'contact': 'CONTACT', 'languages': 'LANGUES', 'skills': 'COMPÉTENCES',
+        'profile': 'PROFIL PROFESSIONNEL', 'experience': 'EXPÉRIENCE PROFESSIONNELLE', 'education': 'FORMATION',
+        'age': '{age} ans', 'canton': 'Canton {canton}', 'native': '{language} - langue maternelle',
+        'english': 'Anglais - courant', 'degree': '{degree} en {field}',
+        'de': 'Allemand', 'fr': 'Français', 'it': 'Italien', 'en': 'Anglais',
+    },
+    'it': {
+        'contact': 'CONTATTO', 'languages': 'LINGUE', 'skills': 'COMPETENZE',
+        'profile': 'PROFILO PROFESSIONALE', 'experience': 'ESPERIENZA PROFESSIONALE', 'education': 'FORMAZIONE',
+        'age': '{age} anni', 'canton': 'Cantone {canton}', 'native': '{language} - madrelingua',
+        'english': 'Inglese - fluente', 'degree': '{degree} in {field}',
+        'de': 'Tedesco', 'fr': 'Francese', 'it': 'Italiano', 'en': 'Inglese',
+    },
+}
+
+REFINED_LABELS = {
+    'de': {"profile": "Profil", "experience": "Berufserfahrung", "education": "Ausbildung", "skills": "Skills",
+           "languages": "Sprachen", "contact": "Kontakt", "age": "{age} Jahre", "photo": "Foto",
+           "generated": "Generiert: {timestamp}"},
+    'fr': {"profile": "Profil", "experience": "Expérience", "education": "Formation", "skills": "Compétences",
+           "languages": "Langues", "contact": "Contact", "age": "{age} ans", "photo": "Photo",
+           "generated": "Généré : {timestamp}"},
+    'it': {"profile": "Profilo", "experience": "Esperienza", "education": "Formazione", "skills": "Competenze",
+           "languages": "Lingue", "contact": "Contatto", "age": "{age} anni", "photo": "Foto",
+           "generated": "Generato: {timestamp}"},
+}
+
+
+@dataclass(frozen=True)
+class Theme:
+    layout: str
+    language: str
+    font_regular: str
+    font_bold: str
+    styles: Mapping[str, ParagraphStyle]
+    colors: Mapping[str, Color]
+    labels: Mapping[str, str]
+
+
+def normalize_language(language: Any) -> str:
+    """'de'/'fr'/'it' for a Language enum, a language string or None (default: de)"""
+    code = str(getattr(language, 'value', language) or DEFAULT_LANGUAGE).lower()[:2]
+    return code if code in LANGUAGES else DEFAULT_LANGUAGE
+
+
+def _classic_styles(base):
+    c = CLASSIC_COLORS
+    normal = base['Normal']
+    return {
+        'name': ParagraphStyle('Name', parent=normal, fontSize=26, textColor=c['primary'], fontName='Helvetica-Bold', spaceAfter=20, alignment=TA_LEFT),
+        'section': ParagraphStyle('Section', parent=normal, fontSize=9, textColor=c['white'], fontName='Helvetica-Bold', backColor=c['primary'], leftIndent=0, rightIndent=0, spaceAfter=5, spaceBefore=3, leading=12),
+        'normal': ParagraphStyle('Normal', parent=normal, fontSize=8.5, textColor=c['text'], spaceAfter=3, leading=11, leftIndent=0),
+        'bullet': ParagraphStyle('Bullet', parent=normal, fontSize=8, textColor=c['text'], spaceAfter=3, leading=11, leftIndent=8),
+        'exp_title': ParagraphStyle('ExpTitle', parent=normal, fontSize=9.5, textColor=c['accent'], fontName='Helvetica-Bold', spaceAfter=1),
+        'company': ParagraphStyle('Company', parent=normal, fontSize=8.5, textColor=c['text'], spaceAfter=0.5),
+        'date': ParagraphStyle('Date', parent=normal, fontSize=7.5, textColor=c['light'], fontName='Helvetica-Oblique', spaceAfter=2),
+        'desc': ParagraphStyle('Desc', parent=normal, fontSize=8.5, textColor=c['text'], spaceAfter=4, leading=11, leftIndent=8),
+    }
+
+
+def _refined_styles(base):
+    c = REFINED_COLORS
+    return {
+        'name': ParagraphStyle("Name", parent=base["Heading1"], fontName=FONT_BOLD_USED, fontSize=26, leading=28,
+                               spaceAfter=4, textColor=c['accent']),
+        'meta': ParagraphStyle("Meta", parent=base["Normal"], fontName=FONT_REGULAR_USED, fontSize=9, leading=11,
+                               textColor=c['meta'], spaceAfter=6),
+        'h': ParagraphStyle("H", parent=base["Heading3"], fontName=FONT_BOLD_USED, fontSize=11, spaceBefore=6,
+                            spaceAfter=6, textColor=c['accent']),
+        'normal': ParagraphStyle("Body", parent=base["BodyText"], fontName=FONT_REGULAR_USED, fontSize=10,
+                                 leading=13, spaceAfter=4),
+        'small': ParagraphStyle("Small", parent=base["Normal"], fontName=FONT_REGULAR_USED, fontSize=8, leading=10,
+                                textColor=c['small']),
+        'bullet': ParagraphStyle("Bullet", parent=base["Normal"], fontName=FONT_REGULAR_USED, fontSize=9.2,
+                                 leftIndent=6, leading=12),
+    }
+
+
+@lru_cache(maxsize=None)
+def _build_theme(language: str, layout: str) -> Theme:
+    base = getSampleStyleSheet()
+    if layout == 'classic':
+        styles, palette, labels = _classic_styles(base), CLASSIC_COLORS, CLASSIC_LABELS[language]
+        fonts = ('Helvetica', 'Helvetica-Bold')
+    elif layout == 'refined':
+        styles, palette, labels = _refined_styles(base), REFINED_COLORS, REFINED_LABELS[language]
+        fonts = (FONT_REGULAR_USED, FONT_BOLD_USED)
+    else:
+        raise ValueError(f"Unknown PDF layout {layout!r}; expected one of {LAYOUTS}")
+    return Theme(layout, language, fonts[0], fonts[1], MappingProxyType(styles), MappingProxyType(dict(palette)),
+                 MappingProxyType(dict(labels)))
+
+
+def get_theme(language: Any = DEFAULT_LANGUAGE, layout: str = 'classic') -> Theme:
+    """Shared theme for ``language`` (code or Language) and ``layout``"""
+    return _build_theme(normalize_language(language), layout)
@@ -0,0 +1,146 @@
+# src/generation/batch.py
+"""
+Offline enrichment through the OpenAI Batch API.
+
+Phase one (``generate --enrich batch``) writes a batch directory:
+
+- requests.jsonl: one Batch API line per distinct, not yet cached prompt,
+  with the LLM cache key as ``custom_id``
+- personas.jsonl: the skeleton personas of the run with their indices
+- manifest.json: the run settings needed to finish it
+
+Phase two (``collect``) loads the Batch API output file into the LLM cache
+and renders the CVs from the cache alone, without live requests.
+"""
+import json
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.data.models import SwissPersona
+from src.generation.openai_client import chat_request, get_cache_key, get_cached_response, save_cached_response
+from src.personas.persona_builder import apply_responses, enrichment_requests
+
+BATCH_VERSION = 1
+BATCH_ENDPOINT = '/v1/chat/completions'
+REQUESTS_FILE = 'requests.jsonl'
+PERSONAS_FILE = 'personas.jsonl'
+MANIFEST_FILE = 'manifest.json'
+
+
+def request_key(request: Dict) -> str:
+    """LLM cache key of an enrichment request (see enrichment_requests)"""
+    return get_cache_key(request['system_message'], request['user_message'], variant=request.get('variant'))
+
+
+def batch_line(request: Dict) -> Dict:
+    """Batch API input line for an enrichment request"""
+    body = chat_request(request['system_message'], request['user_message'],
+                        response_format=request.get('response_format'))
+    return {'custom_id': request_key(request), 'method': 'POST', 'url': BATCH_ENDPOINT, 'body': body}
+
+
+def write_batch(batch_dir: str, personas: List[Tuple[int, SwissPersona]], requests: Iterable[Dict],
+                manifest: Dict) -> Dict:
+    """
+    Write requests.jsonl, personas.jsonl and manifest.json into ``batch_dir``.
+
+    Requests are deduplicated by cache key and already cached ones are skipped.
+
+    Returns:
+        The manifest as written (with request and persona counts)
+    """
+    os.makedirs(batch_dir, exist_ok=True)
+    seen = set()
+    with open(os.path.join(batch_dir, REQUESTS_FILE), 'w', encoding='utf-8') as fh:
+        for request in requests:
+            line = batch_line(request)
+            key = line['custom_id']
+            if key in seen or get_cached_response(key) is not None:
+                continue
+            seen.add(key)
+            fh.write(json.dumps(line, ensure_ascii=False) + '\n')
+    with open(os.path.join(batch_dir, PERSONAS_FILE), 'w', encoding='utf-8') as fh:
+        for index, persona in personas:
+            fh.write(json.dumps({'index': index, 'persona': persona.model_dump(mode='json')}, ensure_ascii=False) + '\n')
+    manifest = dict(manifest, version=BATCH_VERSION, created=time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    requests=len(seen), personas=len(personas))
+    with open(os.path.join(batch_dir, MANIFEST_FILE), 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def load_manifest(batch_dir: str) -> Dict:
+    path = os.path.join(batch_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No batch manifest at {path}")
+    with open(path, 'r', encoding='utf-8') as fh:
+        manifest = json.load(fh)
+    if manifest.get('version') != BATCH_VERSION:
+        raise ValueError(f"Unsupported batch version {manifest.get('version')} in {path}")
+    return manifest
+
+
+def load_personas(batch_dir: str) -> Iterator[Tuple[int, SwissPersona]]:
+    """Yield (index, skeleton persona) from personas.jsonl"""
+    with open(os.path.join(batch_dir, PERSONAS_FILE), 'r', encoding='utf-8') as fh:
+        for line in fh:
+            if line.strip():
+                row = json.loads(line)
+                yield row['index'], SwissPersona(**row['persona'])
+
+
+def read_results(path: str) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Parse a Batch API output (or error) file.
+
+    Yields:
+        (custom_id, response text or None, error message or None)
+    """
+    with open(path, 'r', encoding='utf-8') as fh:
+        for n, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield None, None, f"line {n}: invalid JSON"
+                continue
+            custom_id = row.get('custom_id')
+            response = row.get('response') or {}
+            error = row.get('error')
+            if error or response.get('status_code', 200) != 200:
+                message = (error or {}).get('message') if isinstance(error, dict) else error
+                yield custom_id, None, message or f"status {response.get('status_code')}"
+                continue
+            try:
+                content = response['body']['choices'][0]['message']['content']
+            except (KeyError, IndexError, TypeError):
+                yield custom_id, None, 'no message content'
+                continue
+            yield custom_id, (content or '').strip() or None, None
+
+
+def ingest_results(path: str) -> Dict[str, int]:
+    """Store successful batch results in the LLM cache; returns counts of stored/failed lines"""
+    stored = failed = 0
+    for custom_id, text, error in read_results(path):
+        if custom_id and text:
+            save_cached_response(custom_id, text)
+            stored += 1
+        else:
+            failed += 1
+    return {'stored': stored, 'failed': failed}
+
+
+def complete_persona(persona: SwissPersona, combined: bool = True, variants=None) -> Tuple[SwissPersona, int]:
+    """
+    Enrich ``persona`` from cached responses only (no API calls).
+
+    Missing responses fall back per field like failed live requests.
+
+    Returns:
+        (persona, number of requests without a cached response)
+    """
+    texts = [get_cached_response(request_key(request)) for request in enrichment_requests(persona, combined, variants)]
+    return apply_responses(persona, texts, combined), sum(text is None for text in texts)
@@ -0,0 +1,118 @@
+# src/generation/joint_sampling.py
+"""
+Correlated canton x sex x nationality x age sampling from BFS tables.
+
+The joint table P(canton, sex, nationality) comes from the BFS population
+cube (src/data/demographics.py); age is drawn from P(age | canton, sex).
+Both are flattened into cumulative tables once. A conditioned request
+("only TI, age 30-40") zeroes the excluded cells, renormalizes and caches the
+resulting tables, so narrow filters cost the same per draw as the full
+population and never fall back to rejection sampling.
+
+The BFS demographic balance cube has no age axis, so by default the age
+table is uniform over the working-age range within every (canton, sex)
+cell; pass ``age_weights`` to plug in an age-structured source.
+"""
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.data.demographics import PopulationTable, load_population_table
+
+DEFAULT_AGE_RANGE = (20, 65)
+
+
+def _draw(cum: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """Indices drawn by uniforms ``u`` in [0, 1) from cumulative weights ``cum``"""
+    idx = np.searchsorted(cum, u * cum[-1], side='right')
+    # Rounding can land u * total on the total itself, one past the end; such
+    # a draw belongs to the last entry with weight
+    return np.minimum(idx, np.searchsorted(cum, cum[-1], side='left'))
+
+
+class JointDemographicSampler:
+    def __init__(self, table: PopulationTable, age_range: Tuple[int, int] = DEFAULT_AGE_RANGE,
+                 age_weights: Optional[np.ndarray] = None):
+        """
+        Args:
+            table: Population counts by canton, sex and nationality
+            age_range: Inclusive (min_age, max_age) of the age table
+            age_weights: Optional weights of shape (ages,) or (cantons, sexes, ages)
+        """
+        self.table = table
+        self.cantons = table.cantons
+        self.sexes = table.sexes
+        self.nationalities = table.nationalities
+        self.ages = np.arange(age_range[0], age_range[1] + 1)
+        shape = (len(self.cantons), len(self.sexes), len(self.ages))
+        if age_weights is None:
+            age_weights = np.ones(shape)
+        self.age_weights = np.broadcast_to(np.asarray(age_weights, dtype=float), shape)
+        self.cell_weights = table.counts.astype(float)
+        self._conditioned: Dict[tuple, tuple] = {}
+
+    @classmethod
+    def from_data_dir(cls, data_dir: str = 'data', year: Optional[str] = None, **kwargs) -> 'JointDemographicSampler':
+        return cls(load_population_table(data_dir, year), **kwargs)
+
+    def _tables(self, cantons, sexes, nationalities, age_range):
+        """Cumulative cell and age tables for one condition, built once and cached"""
+        key = (cantons, sexes, nationalities, age_range)
+        cached = self._conditioned.get(key)
+        if cached is not None:
+            return cached
+        cells = self.cell_weights.copy()
+        if cantons is not None:
+            keep = np.isin(self.cantons, cantons)
+            if not keep.any():
+                raise ValueError(f"No BFS population for cantons {list(cantons)}")
+            cells[~keep] = 0
+        if sexes is not None:
+            cells[:, ~np.isin(self.sexes, sexes)] = 0
+        if nationalities is not None:
+            cells[:, :, ~np.isin(self.nationalities, nationalities)] = 0
+        ages = self.age_weights
+        if age_range is not None:
+            ages = np.where((self.ages >= age_range[0]) & (self.ages <= age_range[1]), ages, 0.0)
+            if not ages.any():
+                raise ValueError(f"Age range {age_range} outside {self.ages[0]}-{self.ages[-1]}")
+        # A cell with people but no admissible age (all-zero age row) can't be drawn
+        cells = cells * (ages.sum(axis=2) > 0)[:, :, None]
+        cell_cum = np.cumsum(cells.ravel())
+        if cell_cum[-1] <= 0:
+            raise ValueError("Conditions leave no population to sample from")
+        age_cum = np.cumsum(ages.reshape(-1, len(self.ages)), axis=1)
+        cached = self._conditioned[key] = (cell_cum, age_cum)
+        return cached
+
+    def sample(self, n: int, gen: np.random.Generator, cantons: Optional[Sequence[str]] = None,
+               sexes: Optional[Sequence[str]] = None, nationalities: Optional[Sequence[str]] = None,
+               age_range: Optional[Tuple[int, int]] = None) -> Dict[str, np.ndarray]:
+        """
+        Draw n correlated (canton, sex, nationality, age) tuples.
+
+        Returns:
+            Dict of arrays: 'canton' and 'sex'/'nationality' as indices into
+            self.cantons/self.sexes/self.nationalities, 'age' in years
+        """
+        cantons = tuple(cantons) if cantons is not None else None
+        sexes = tuple(sexes) if sexes is not None else None
+        nationalities = tuple(nationalities) if nationalities is not None else None
+        age_range = tuple(age_range) if age_range is not None else None
+        cell_cum, age_cum = self._tables(cantons, sexes, nationalities, age_range)
+
+        cells = _draw(cell_cum, gen.random(n))
+        canton_idx, sex_idx, nat_idx = np.unravel_index(cells, self.cell_weights.shape)
+        # Age per (canton, sex) row of the conditional table, one searchsorted per group
+        rows = canton_idx * len(self.sexes) + sex_idx
+        age_idx = np.empty(n, dtype=np.intp)
+        for row in np.unique(rows).tolist():
+            mask = rows == row
+            cum = age_cum[row]
+            age_idx[mask] = _draw(cum, gen.random(int(mask.sum())))
+        return {
+            'canton': canton_idx,
+            'sex': sex_idx,
+            'nationality': nat_idx,
+            'age': self.ages[age_idx],
+        }
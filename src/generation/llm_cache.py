@@ -0,0 +1,380 @@
+"""SQLite-backed cache for LLM responses, with an in-process LRU tier
+
+One database file (WAL mode) instead of one JSON file per prompt hash. Keys are
+the same ``get_cache_key`` hashes as before. Each entry records its size, hit
+count and created/last-used timestamps. Once the cache grows past
+``max_entries`` or ``max_bytes`` it evicts least-recently-used entries down to
+``EVICT_TO`` of the cap. Hits are counted in memory and written in one
+batch on the next set, on close(), or once ``TOUCH_FLUSH_AT`` have piled up,
+so reads don't write.
+
+Connections are per thread and per process, and SQLite's WAL plus a busy
+timeout serialize writers, so several generator processes can share one
+cache file safely.
+
+``MemoryCache`` is a bounded LRU dict that sits in front of it within one
+process. Prompts repeated within a batch are then served without touching the
+database.
+
+``SingleFlight`` coalesces concurrent misses on the same key: the first caller
+sends the request and later callers (threads or asyncio tasks, in any event
+loop) wait for its result instead of sending duplicates.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+# Evict down to this fraction of the cap, so eviction doesn't run on every insert
+EVICT_TO = 0.9
+BUSY_TIMEOUT_S = 30
+# Pending LRU touches (hit counts, last-used times) written in one batch
+TOUCH_FLUSH_AT = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals VALUES (0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN
+    UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN
+    UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_resize AFTER UPDATE OF size ON responses BEGIN
+    UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 0;
+END;
+"""
+
+
+class TierCounters:
+    """Hit/miss counters of one cache tier"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+
+class MemoryCache:
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Most entries kept (least recently used dropped first)
+            max_bytes: Most response bytes kept; larger single responses are not cached
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.counters = TierCounters()
+        self._data: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: str, count: bool = True) -> Optional[str]:
+        """Cached value or None; ``count=False`` leaves the hit/miss counters alone"""
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+        if count:
+            self.counters.record(value is not None)
+        return value
+
+    def set(self, key: str, value: str):
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.encode('utf-8'))
+            self._data[key] = value
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= len(evicted.encode('utf-8'))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+class SingleFlight:
+    """
+    At most one in-flight computation per key.
+
+    Counters record followers (joined an in-flight call) as hits and leaders
+    as misses. A sync caller never waits on a call led from its own thread
+    (e.g. an event loop it is blocking), it runs the call itself instead.
+    """
+
+    def __init__(self):
+        self.counters = TierCounters()
+        self._calls: Dict[str, Tuple[Future, int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._calls)
+
+    def _begin(self, key: str, blocking: bool) -> Tuple[Future, bool]:
+        thread = threading.get_ident()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and not (blocking and call[1] == thread):
+                self.counters.record(True)
+                return call[0], False
+            future = Future()
+            if call is None:
+                self._calls[key] = (future, thread)
+            self.counters.record(False)
+            return future, True
+
+    def _finish(self, key: str, future: Future, result=None, error: Optional[BaseException] = None):
+        with self._lock:
+            if self._calls.get(key, (None,))[0] is future:
+                del self._calls[key]
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def run(self, key: str, fn: Callable[[], object]):
+        """Result of ``fn()``, or of the call already in flight for ``key``"""
+        future, leader = self._begin(key, blocking=True)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def run_async(self, key: str, fn: Callable[[], Awaitable[object]]):
+        """Async run(): followers await the leader without blocking their loop"""
+        future, leader = self._begin(key, blocking=False)
+        if not leader:
+            # shield: a cancelled follower must not cancel the shared future
+            return await asyncio.shield(asyncio.wrap_future(future))
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+
+class SQLiteCache:
+    def __init__(self, path, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            path: Database file (created with its directory if missing)
+            max_entries: Evict LRU entries above this many entries (None: no cap)
+            max_bytes: Evict LRU entries above this many response bytes (None: no cap)
+        """
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.counters = TierCounters()
+        self._local = threading.local()
+        # key -> [hits, last_used] not yet written
+        self._touches: Dict[str, list] = {}
+        self._touch_lock = threading.Lock()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not cross threads or a fork
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+            local.conn.execute('PRAGMA synchronous=NORMAL')
+            local.pid = os.getpid()
+        return local.conn
+
+    def _write(self, fn):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return result
+
+    def get(self, key: str, count: bool = True) -> Optional[str]:
+        """
+        Cached response for ``key`` (and count the hit, written later), or None.
+
+        ``count=False`` leaves the hit/miss counters alone, for repeated lookups.
+        """
+        row = self._conn().execute('SELECT response FROM responses WHERE key = ?', (key,)).fetchone()
+        if count:
+            self.counters.record(row is not None)
+        if row is None:
+            return None
+        with self._touch_lock:
+            touch = self._touches.setdefault(key, [0, 0.0])
+            touch[0] += 1
+            touch[1] = time.time()
+            pending = len(self._touches)
+        if pending >= TOUCH_FLUSH_AT:
+            self.flush()
+        return row[0]
+
+    def _write_touches(self, conn):
+        with self._touch_lock:
+            touches, self._touches = self._touches, {}
+        if touches:
+            conn.executemany('UPDATE responses SET hits = hits + ?, last_used = MAX(last_used, ?) WHERE key = ?',
+                             [(hits, last_used, key) for key, (hits, last_used) in touches.items()])
+
+    def flush(self):
+        """Write pending hit counts and last-used times"""
+        if not self._touches:
+            return
+        try:
+            self._write(self._write_touches)
+        except sqlite3.OperationalError:
+            pass  # lost LRU touches under heavy write contention are harmless
+
+    def set(self, key: str, response: str):
+        """Store ``response`` under ``key``, evicting LRU entries if over the cap"""
+        now = time.time()
+        size = len(response.encode('utf-8'))
+
+        def upsert(conn):
+            conn.execute(
+                'INSERT INTO responses (key, response, size, hits, created, last_used) VALUES (?, ?, ?, 0, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET response = excluded.response, size = excluded.size, '
+                'last_used = excluded.last_used',
+                (key, response, size, now, now))
+            self._write_touches(conn)
+            self._evict(conn)
+
+        self._write(upsert)
+
+    def _evict(self, conn, max_entries=None, max_bytes=None) -> int:
+        max_entries = self.max_entries if max_entries is None else max_entries
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries, total = conn.execute('SELECT entries, bytes FROM totals WHERE id = 0').fetchone()
+        over_entries = max_entries is not None and entries > max_entries
+        over_bytes = max_bytes is not None and total > max_bytes
+        if not (over_entries or over_bytes):
+            return 0
+        target_entries = int(max_entries * EVICT_TO) if over_entries else entries
+        target_bytes = int(max_bytes * EVICT_TO) if over_bytes else total
+        evicted = 0
+        while entries > target_entries or total > target_bytes:
+            n = entries - target_entries
+            if total > target_bytes and entries:
+                # Estimate from the average entry size; the loop corrects it
+                n = max(n, -(-(total - target_bytes) * entries // total))
+            cur = conn.execute('DELETE FROM responses WHERE key IN '
+                               '(SELECT key FROM responses ORDER BY last_used LIMIT ?)', (max(n, 1),))
+            if cur.rowcount <= 0:
+                break
+            evicted += cur.rowcount
+            entries, total = conn.execute('SELECT entries, bytes FROM totals WHERE id = 0').fetchone()
+        return evicted
+
+    def evict(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> int:
+        """Evict LRU entries down to the caps (default: the configured ones); returns the count"""
+        def evict(conn):
+            self._write_touches(conn)
+            return self._evict(conn, max_entries, max_bytes)
+
+        return self._write(evict)
+
+    def compact(self) -> Dict[str, int]:
+        """Evict to the caps, checkpoint the WAL and VACUUM the file"""
+        evicted = self.evict()
+        conn = self._conn()
+        conn.execute('VACUUM')
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        stats = self.stats()
+        stats['evicted'] = evicted
+        return stats
+
+    def import_json_dir(self, directory) -> int:
+        """Copy legacy one-file-per-key JSON entries (``<key>.json``) into the cache"""
+        directory = Path(directory)
+        if not directory.is_dir():
+            return 0
+        rows = []
+        for f in directory.glob('*.json'):
+            try:
+                with open(f, 'r', encoding='utf-8') as fh:
+                    response = json.load(fh).get('response')
+            except (OSError, ValueError, AttributeError):
+                continue
+            if response:
+                mtime = f.stat().st_mtime
+                rows.append((f.stem, response, len(response.encode('utf-8')), mtime, mtime))
+
+        def insert(conn):
+            before = conn.execute('SELECT entries FROM totals WHERE id = 0').fetchone()[0]
+            conn.executemany('INSERT OR IGNORE INTO responses (key, response, size, hits, created, last_used) '
+                             'VALUES (?, ?, ?, 0, ?, ?)', rows)
+            self._write_touches(conn)
+            self._evict(conn)
+            return conn.execute('SELECT entries FROM totals WHERE id = 0').fetchone()[0] - before
+
+        return self._write(insert)
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count, response bytes, total hits and database file size"""
+        self.flush()
+        conn = self._conn()
+        entries, total = conn.execute('SELECT entries, bytes FROM totals WHERE id = 0').fetchone()
+        hits = conn.execute('SELECT COALESCE(SUM(hits), 0) FROM responses').fetchone()[0]
+        file_bytes = sum(os.path.getsize(p) for p in (self.path, self.path + '-wal') if os.path.exists(p))
+        return {'entries': entries, 'bytes': total, 'hits': hits, 'file_bytes': file_bytes}
+
+    def close(self):
+        """Write pending touches and close this thread's connection"""
+        self.flush()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and getattr(self._local, 'pid', None) == os.getpid():
+            conn.close()
+        self._local = threading.local()
@@ -0,0 +1,211 @@
+# src/generation/offline_text.py
+"""
+Offline CV text: summaries, skills and job descriptions without an LLM.
+
+Texts are assembled from per-language phrase banks (templates/phrases/<lang>.json)
+that fill the same fields as the LLM prompt templates in templates/prompts/
+(position, years, industry, canton). Position titles are localized through the
+occupation data when the title is known there.
+
+Every choice is drawn from a keyed hash of the persona (plus an optional
+seed), so the same persona always gets the same text, in any process and in
+any order. A summary takes under 20 microseconds, a whole CV about 30.
+"""
+import hashlib
+import json
+import os
+import string
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+
+PHRASE_DIR = os.path.join('templates', 'phrases')
+PROMPT_DIR = os.path.join('templates', 'prompts')
+DEFAULT_LANGUAGE = 'de'
+# Fields the phrase banks may use beyond the prompt template placeholders
+EXTRA_FIELDS = {'level', 'focus', 'strength'}
+INDUSTRY_ALIASES = {
+    'tech': 'technology', 'software': 'technology', 'it': 'technology',
+    'banking': 'finance', 'insurance': 'finance',
+    'health': 'healthcare', 'pharma': 'healthcare',
+}
+TECHNICAL_SKILLS = 5
+SOFT_SKILLS = 2
+DUTIES_PER_JOB = 2
+
+
+class _Draws:
+    """Choices taken digit by digit from a 128-bit keyed hash"""
+    __slots__ = ('state',)
+
+    def __init__(self, key: bytes, salt: bytes):
+        self.state = int.from_bytes(hashlib.blake2b(key, digest_size=16, salt=salt).digest(), 'little')
+
+    def pick(self, items: Sequence):
+        self.state, i = divmod(self.state, len(items))
+        return items[i]
+
+    def sample(self, items: Sequence, k: int) -> list:
+        pool = list(items)
+        state = self.state
+        out = []
+        for n in range(len(pool), max(len(pool) - k, 0), -1):
+            state, i = divmod(state, n)
+            out.append(pool.pop(i))
+        self.state = state
+        return out
+
+
+def _fields(template: str) -> set:
+    return {name for _, name, _, _ in string.Formatter().parse(template) if name}
+
+
+def prompt_fields(language: str, prompt_dir: str = PROMPT_DIR) -> set:
+    """Placeholders of the language's summary/skills prompt templates"""
+    fields = set()
+    for name in ('summary.txt', 'skills.txt'):
+        path = os.path.join(prompt_dir, language, name)
+        if os.path.exists(path):
+            # The templates are not all UTF-8; only the ASCII placeholders matter here
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                fields |= _fields(f.read())
+    return fields
+
+
+def load_phrase_bank(language: str, phrase_dir: str = PHRASE_DIR, prompt_dir: str = PROMPT_DIR) -> Dict:
+    """Load and check templates/phrases/<language>.json"""
+    path = os.path.join(phrase_dir, f"{language}.json")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Phrase bank not found at {path}")
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        bank = json.load(f)
+    allowed = prompt_fields(language, prompt_dir) | EXTRA_FIELDS
+    for part, templates in bank['summary'].items():
+        for template in templates:
+            unknown = _fields(template) - allowed
+            if unknown:
+                raise ValueError(f"{path}: summary {part} template uses unknown fields {sorted(unknown)}")
+    return bank
+
+
+class OfflineTextEngine:
+    def __init__(self, occupations: Iterable = (), seed: int = 0, phrase_dir: str = PHRASE_DIR,
+                 prompt_dir: str = PROMPT_DIR):
+        """
+        Args:
+            occupations: OccupationCategory objects or dicts with a ``title``
+                translation dict, used to localize position titles
+            seed: Mixed into every persona key; change it for a different text set
+            phrase_dir: Directory of <lang>.json phrase banks
+            prompt_dir: Directory of the <lang>/{summary,skills}.txt prompt templates
+        """
+        self.seed = seed
+        self.phrase_dir = phrase_dir
+        self.prompt_dir = prompt_dir
+        self._banks: Dict[str, Dict] = {}
+        self._contexts: Dict[tuple, Dict] = {}
+        self._titles: Dict[str, Dict[str, str]] = {}
+        for occupation in occupations:
+            titles = occupation.get('title') if isinstance(occupation, dict) else getattr(occupation, 'title', None)
+            if isinstance(titles, dict):
+                for title in titles.values():
+                    self._titles[title] = titles
+
+    def bank(self, language: str) -> Dict:
+        bank = self._banks.get(language)
+        if bank is None:
+            try:
+                bank = load_phrase_bank(language, self.phrase_dir, self.prompt_dir)
+            except FileNotFoundError:
+                bank = self.bank(DEFAULT_LANGUAGE) if language != DEFAULT_LANGUAGE else None
+                if bank is None:
+                    raise
+            self._banks[language] = bank
+        return bank
+
+    def _key(self, persona) -> bytes:
+        return f"{self.seed}|{persona.full_name}|{persona.email}|{persona.phone}|{persona.age}".encode('utf-8')
+
+    def _context(self, language: str, industry: str) -> Dict:
+        """Phrase lists resolved for one language and industry"""
+        context = self._contexts.get((language, industry))
+        if context is None:
+            bank = self.bank(language)
+            key = industry.lower()
+            key = INDUSTRY_ALIASES.get(key, key)
+            context = {
+                'bank': bank,
+                'industry': bank['industries'].get(key, bank['industries']['default']).format(industry=industry),
+                'focus': bank['focus'].get(key) or bank['focus']['default'],
+                'skills': bank['skills'].get(key) or bank['skills']['default'],
+                'duties': bank['duties'].get(key) or bank['duties']['default'],
+            }
+            self._contexts[(language, industry)] = context
+        return context
+
+    def _level(self, persona, bank) -> str:
+        level = persona.current_title.split(' ', 1)[0]
+        if level not in bank['levels']:
+            years = persona.experience_years
+            level = 'Junior' if years < 3 else 'Mid' if years < 7 else 'Senior'
+        return bank['levels'][level]
+
+    def _position(self, persona, language: str) -> str:
+        titles = self._titles.get(persona.current_title)
+        return titles.get(language, persona.current_title) if titles else persona.current_title
+
+    def _years(self, persona, bank) -> str:
+        n = int(persona.experience_years)
+        forms = bank['years']
+        return forms['zero'] if n <= 0 else forms['one'] if n == 1 else forms['other'].format(n=n)
+
+    def summary(self, persona, key: Optional[bytes] = None) -> str:
+        """Three-sentence professional summary in the persona's language"""
+        language = persona.language.value
+        context = self._context(language, persona.industry)
+        bank = context['bank']
+        parts = bank['summary']
+        draws = _Draws(key or self._key(persona), b'summary')
+        focus = draws.sample(context['focus'], 3)
+        strengths = draws.sample(bank['strengths'], 3)
+        fields = {
+            'position': self._position(persona, language),
+            'years': self._years(persona, bank),
+            'industry': context['industry'],
+            'canton': persona.canton,
+            'level': self._level(persona, bank),
+        }
+        # Each sentence gets its own focus and strength, so none repeats
+        return ' '.join((
+            draws.pick(parts['openers']).format(focus=focus[0], strength=strengths[0], **fields),
+            draws.pick(parts['middles']).format(focus=focus[1 % len(focus)], strength=strengths[1 % len(strengths)], **fields),
+            draws.pick(parts['closers']).format(focus=focus[2 % len(focus)], strength=strengths[2 % len(strengths)], **fields),
+        ))
+
+    def skills(self, persona, key: Optional[bytes] = None) -> List[str]:
+        """Industry skills followed by soft skills"""
+        context = self._context(persona.language.value, persona.industry)
+        draws = _Draws(key or self._key(persona), b'skills')
+        return draws.sample(context['skills'], TECHNICAL_SKILLS) + draws.sample(context['bank']['soft_skills'], SOFT_SKILLS)
+
+    def job_description(self, persona, index: int = 0, key: Optional[bytes] = None) -> str:
+        """Description of career_history[index] (a few duty sentences)"""
+        context = self._context(persona.language.value, persona.industry)
+        draws = _Draws(key or self._key(persona), b'job%d' % index)
+        return ' '.join(draws.sample(context['duties'], DUTIES_PER_JOB))
+
+    def enrich(self, persona):
+        """Fill summary, skills and every job description of ``persona``"""
+        key = self._key(persona)
+        persona.summary = self.summary(persona, key)
+        persona.skills = self.skills(persona, key)
+        for i, job in enumerate(persona.career_history):
+            job['desc'] = self.job_description(persona, i, key)
+        return persona
+
+
+@lru_cache(maxsize=None)
+def get_text_engine(seed: int = 0) -> OfflineTextEngine:
+    """Shared OfflineTextEngine, with the sampling engine's occupations"""
+    from src.generation.sampling import get_engine
+
+    return OfflineTextEngine(get_engine().occupations, seed=seed)
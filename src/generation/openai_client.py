@@ -4,110 +4,408 @@ import os
 import json
 from pathlib import Path
 import hashlib
+import asyncio
+import atexit
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import nullcontext
 
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import (
+        OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient, APIConnectionError, APITimeoutError,
+    )
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
-# Cache directory
+from src.generation.llm_cache import MemoryCache, SQLiteCache, SingleFlight, TierCounters
+from src.generation.rate_limit import (
+    AdaptiveConcurrency, RateLimiter, backoff_delay, estimate_tokens, retry_after_seconds,
+)
+
+# Connection pool shared by all calls; override via environment or configure_client()
+POOL_CONFIG = {
+    'max_connections': int(os.getenv('OPENAI_MAX_CONNECTIONS', '64')),
+    'max_keepalive_connections': int(os.getenv('OPENAI_MAX_KEEPALIVE', '32')),
+    'keepalive_expiry': float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', '60')),
+    'connect_timeout': float(os.getenv('OPENAI_CONNECT_TIMEOUT', '10')),
+    'timeout': float(os.getenv('OPENAI_TIMEOUT', '30')),
+}
+
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_TEMPERATURE = 0.7
+DEFAULT_MAX_TOKENS = 500
+
+# Client-side quota (0 = unlimited) and retry budget; see rate_limit.py
+RATE_LIMIT_RPM = float(os.getenv('OPENAI_RPM', '0'))
+RATE_LIMIT_TPM = float(os.getenv('OPENAI_TPM', '0'))
+MAX_ATTEMPTS = int(os.getenv('OPENAI_MAX_ATTEMPTS', '6'))
+rate_limiter = RateLimiter(RATE_LIMIT_RPM, RATE_LIMIT_TPM)
+
+_client = None
+_client_key = None
+# httpx async pools are bound to the event loop they were first used on
+_async_clients = weakref.WeakKeyDictionary()
+_client_lock = threading.Lock()
+
+# Response cache: one SQLite file (see llm_cache.py); the old one-JSON-file-per-key
+# directory is still read, and entries found there are copied over
 CACHE_DIR = Path('src/cache/openai')
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_DB = Path(os.getenv('OPENAI_CACHE_DB', 'src/cache/openai.sqlite3'))
+CACHE_MAX_ENTRIES = int(os.getenv('OPENAI_CACHE_MAX_ENTRIES', '0')) or None
+CACHE_MAX_BYTES = int(float(os.getenv('OPENAI_CACHE_MAX_MB', '1024')) * 1024 * 1024) or None
+# In-process LRU tier in front of the database
+MEMORY_CACHE_ENTRIES = int(os.getenv('OPENAI_MEMORY_CACHE_ENTRIES', '10000'))
+MEMORY_CACHE_BYTES = int(float(os.getenv('OPENAI_MEMORY_CACHE_MB', '64')) * 1024 * 1024)
 
-def get_cache_key(system_msg, user_msg, model="gpt-4o-mini"):
-    """Generate cache key from messages"""
+_cache = None
+_cache_lock = threading.Lock()
+memory_cache = MemoryCache(MEMORY_CACHE_ENTRIES, MEMORY_CACHE_BYTES)
+_legacy_counters = TierCounters()
+# Identical prompts missing the cache at the same time share one request
+in_flight = SingleFlight()
+
+def get_cache():
+    """Process-wide SQLiteCache for OpenAI responses, opened on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SQLiteCache(CACHE_DB, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES)
+                # Hit counts are buffered in memory until then
+                atexit.register(_cache.flush)
+    return _cache
+
+def get_cache_key(system_msg, user_msg, model=DEFAULT_MODEL, variant=None):
+    """Generate cache key from messages (and the variant number for variant pools)"""
     combined = f"{model}:{system_msg}:{user_msg}"
+    if variant is not None:
+        combined += f":variant={variant}"
     return hashlib.sha256(combined.encode()).hexdigest()
 
-def get_cached_response(cache_key):
-    """Get cached OpenAI response"""
+def _get_legacy_response(cache_key, count=True):
     cache_file = CACHE_DIR / f"{cache_key}.json"
+    response = None
     if cache_file.exists():
         try:
             with open(cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f).get('response')
+                response = json.load(f).get('response')
         except:
-            return None
-    return None
+            response = None
+    if count:
+        _legacy_counters.record(bool(response))
+    return response
+
+def get_cached_response(cache_key, count=True):
+    """
+    Get cached OpenAI response (memory tier, then SQLite, then legacy JSON files).
+
+    ``count=False`` leaves the per-tier hit/miss counters alone, so a second
+    lookup of the same request is not reported as another miss.
+    """
+    response = memory_cache.get(cache_key, count)
+    if response is not None:
+        return response
+    try:
+        response = get_cache().get(cache_key, count)
+    except sqlite3.Error as e:
+        print(f"  ⚠️  Response cache unavailable: {str(e)[:100]}")
+        response = None
+    if response is None:
+        response = _get_legacy_response(cache_key, count)
+        if response:
+            save_cached_response(cache_key, response)
+    elif response:
+        memory_cache.set(cache_key, response)
+    return response
+
+def _cached_call(cache_key):
+    """Cached response for a chat call (reported as such), or None"""
+    cached = get_cached_response(cache_key)
+    if cached:
+        print("  📦 Using cached response")
+    return cached
 
 def save_cached_response(cache_key, response):
     """Save OpenAI response to cache"""
-    cache_file = CACHE_DIR / f"{cache_key}.json"
+    memory_cache.set(cache_key, response)
     try:
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump({'response': response}, f)
-    except:
+        get_cache().set(cache_key, response)
+    except sqlite3.Error:
         pass
 
-def call_openai_chat(system_message, user_message, model="gpt-4o-mini", temperature=0.7, max_tokens=500):
+def cache_stats():
+    """Hit/miss counts and hit rate per cache tier for this process"""
+    stats = {'memory': memory_cache.counters.snapshot()}
+    if _cache is not None:
+        stats['sqlite'] = _cache.counters.snapshot()
+    stats['legacy'] = _legacy_counters.snapshot()
+    stats['in-flight'] = in_flight.counters.snapshot()
+    return stats
+
+def _pool_options():
+    return {
+        'limits': httpx.Limits(
+            max_connections=POOL_CONFIG['max_connections'],
+            max_keepalive_connections=POOL_CONFIG['max_keepalive_connections'],
+            keepalive_expiry=POOL_CONFIG['keepalive_expiry'],
+        ),
+        'timeout': httpx.Timeout(POOL_CONFIG['timeout'], connect=POOL_CONFIG['connect_timeout']),
+    }
+
+def _client_settings():
+    # Rebuild the clients when the key or endpoint changes (e.g. tests switching OPENAI_BASE_URL)
+    return os.getenv('OPENAI_API_KEY'), os.getenv('OPENAI_BASE_URL')
+
+def configure_client(**pool):
+    """
+    Update POOL_CONFIG (max_connections, max_keepalive_connections,
+    keepalive_expiry, connect_timeout, timeout) and drop the existing clients
+    """
+    unknown = set(pool) - set(POOL_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown pool options: {', '.join(sorted(unknown))}")
+    POOL_CONFIG.update(pool)
+    close_clients()
+
+def get_client():
+    """
+    Process-wide OpenAI client with a pooled keep-alive HTTP connection.
+
+    Thread-safe; returns None without SDK or API key.
+    """
+    global _client, _client_key
+    if not OPENAI_AVAILABLE:
+        return None
+    api_key, base_url = settings = _client_settings()
+    if not api_key:
+        return None
+    with _client_lock:
+        if _client is None or _client_key != settings:
+            if _client is not None:
+                _client.close()
+            # Retries are handled here (rate limiter + Retry-After backoff), not by the SDK
+            _client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0,
+                             http_client=DefaultHttpxClient(**_pool_options()))
+            _client_key = settings
+        return _client
+
+def get_async_client():
+    """
+    AsyncOpenAI client shared by all tasks of the running event loop.
+
+    Honors OPENAI_BASE_URL, e.g. to point at a local stub server
+    (scripts/stub_openai_server.py). Returns None without SDK or API key.
+    """
+    if not OPENAI_AVAILABLE:
+        return None
+    api_key, base_url = settings = _client_settings()
+    if not api_key:
+        return None
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        cached = _async_clients.get(loop)
+        if cached is None or cached[0] != settings:
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0,
+                                 http_client=DefaultAsyncHttpxClient(**_pool_options()))
+            cached = _async_clients[loop] = (settings, client)
+        return cached[1]
+
+async def aclose_async_client():
+    """Close the running loop's shared AsyncOpenAI client; call before the loop ends"""
+    with _client_lock:
+        cached = _async_clients.pop(asyncio.get_running_loop(), None)
+    if cached is not None:
+        await cached[1].close()
+
+def close_clients():
+    """Close the shared sync client and forget the async ones"""
+    global _client, _client_key
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = _client_key = None
+        _async_clients.clear()
+
+atexit.register(close_clients)
+
+def configure_rate_limits(requests_per_minute=None, tokens_per_minute=None):
+    """Replace the shared rate limiter (None or 0 = unlimited)"""
+    global rate_limiter
+    rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+
+def chat_request(system_message, user_message, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE,
+                 max_tokens=DEFAULT_MAX_TOKENS, response_format=None):
+    """Chat completions request body (also the body of a Batch API line)"""
+    return dict(
+        model=model,
+        messages=[
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ],
+        temperature=temperature,
+        max_tokens=max_tokens,
+        **({'response_format': response_format} if response_format else {}),
+    )
+
+def _retry_delay(error, attempt):
+    """Backoff before the next attempt, or None if ``error`` is not worth retrying"""
+    if attempt + 1 >= MAX_ATTEMPTS:
+        return None
+    status = getattr(error, 'status_code', None)
+    retryable = isinstance(error, (APIConnectionError, APITimeoutError)) or status in (408, 409, 429) or (
+        status is not None and status >= 500)
+    if not retryable:
+        return None
+    return backoff_delay(attempt, retry_after_seconds(error))
+
+def _is_throttle(error):
+    return getattr(error, 'status_code', None) == 429
+
+def _usage_tokens(response):
+    usage = getattr(response, 'usage', None)
+    return getattr(usage, 'total_tokens', None)
+
+def call_openai_chat(system_message, user_message, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE,
+                     max_tokens=DEFAULT_MAX_TOKENS, response_format=None, variant=None):
     """
     Call OpenAI Chat API (v1.0+ compatible)
     
+    Requests go through the shared rate limiter (rate_limiter). Rate limits,
+    timeouts and 5xx errors are retried with backoff (honoring Retry-After)
+    up to MAX_ATTEMPTS before falling back. Concurrent calls with the same
+    cache key (sync or async) send one request and share its result.
+    
     Args:
         system_message: System prompt
         user_message: User prompt
         model: Model name (default: gpt-4o-mini)
         temperature: Temperature (0-2)
         max_tokens: Max tokens in response
+        response_format: Optional structured-output format (e.g. a JSON schema)
+        variant: Variant number; the same prompt is cached separately per variant
         
     Returns:
-        Generated text response
+        Generated text response, or None if the request failed (see get_fallback_response)
     """
     
     # Check cache first
-    cache_key = get_cache_key(system_message, user_message, model)
-    cached = get_cached_response(cache_key)
+    cache_key = get_cache_key(system_message, user_message, model, variant)
+    cached = _cached_call(cache_key)
     if cached:
-        print(f"  📦 Using cached response")
         return cached
     
+    def fetch():
+        # A leader that finished after the check above has cached the response by now;
+        # the lookup was counted there already
+        return get_cached_response(cache_key, count=False) or _call_openai_chat(
+            cache_key, system_message, user_message, model, temperature, max_tokens, response_format)
+    
+    return in_flight.run(cache_key, fetch)
+
+def _call_openai_chat(cache_key, system_message, user_message, model, temperature, max_tokens, response_format):
     # If OpenAI not available, use fallback
     if not OPENAI_AVAILABLE:
-        return get_fallback_response(system_message, user_message)
+        return get_fallback_response(system_message, user_message, response_format)
     
-    try:
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            print("  ⚠️  No OPENAI_API_KEY set, using fallback")
-            return get_fallback_response(system_message, user_message)
-        
-        # Modern OpenAI v1.0+ API
-        client = OpenAI(api_key=api_key)
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens,
-            timeout=30
-        )
-        
-        result = response.choices[0].message.content.strip()
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        print("  ⚠️  No OPENAI_API_KEY set, using fallback")
+        return get_fallback_response(system_message, user_message, response_format)
+    
+    # Shared client: keep-alive connections and TLS sessions are reused across calls
+    client = get_client()
+    request = chat_request(system_message, user_message, model, temperature, max_tokens, response_format)
+    estimate = estimate_tokens(system_message, user_message, max_tokens)
+    
+    for attempt in range(MAX_ATTEMPTS):
+        time.sleep(rate_limiter.reserve(estimate))
+        try:
+            response = client.chat.completions.create(**request)
+            result = response.choices[0].message.content.strip()
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None:
+                print(f"  ⚠️  OpenAI call failed: {str(e)[:100]}")
+                return get_fallback_response(system_message, user_message, response_format)
+            time.sleep(delay)
+            continue
+        rate_limiter.record_usage(estimate, _usage_tokens(response))
         save_cached_response(cache_key, result)
         return result
+
+async def call_openai_chat_async(system_message, user_message, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE,
+                                 max_tokens=DEFAULT_MAX_TOKENS, response_format=None, variant=None, client=None,
+                                 semaphore=None):
+    """
+    Async counterpart of call_openai_chat, sharing its cache, limits and fallbacks.
+    
+    Args:
+        client: AsyncOpenAI client (default: get_async_client())
+        semaphore: Optional asyncio.Semaphore or AdaptiveConcurrency bounding
+            requests in flight; an AdaptiveConcurrency is told about successes
+            and 429s. The slot is released while backing off.
         
-    except Exception as e:
-        print(f"  ⚠️  OpenAI call failed: {str(e)[:100]}")
-        return get_fallback_response(system_message, user_message)
-
-def get_fallback_response(system_message, user_message):
-    """Fallback response when OpenAI is unavailable"""
-    if "summary" in user_message.lower():
-        return (
-            "Erfahrener Fachmann mit umfangreicher Expertise in Software-Entwicklung, "
-            "Projektmanagement und agilen Methoden. Nachgewiesener Erfolg bei der "
-            "Implementierung innovativer Lösungen und der Leitung hochperformanter Teams."
-        )
-    elif "responsibilities" in user_message.lower() or "aufgaben" in user_message.lower():
-        return (
-            "- Softwareentwicklung und -wartung\n"
-            "- Projektleitung und Koordination\n"
-            "- Teamkollaboration und Mentoring\n"
-            "- Technische Dokumentation"
-        )
-    else:
-        return "Professioneller mit fundierten Kenntnissen und praktischer Erfahrung."
+    Returns:
+        Generated text response
+    """
+    cache_key = get_cache_key(system_message, user_message, model, variant)
+    cached = _cached_call(cache_key)
+    if cached:
+        return cached
+    
+    async def fetch():
+        # A leader that finished after the check above has cached the response by now;
+        # the lookup was counted there already
+        return get_cached_response(cache_key, count=False) or await _call_openai_chat_async(
+            cache_key, system_message, user_message, model, temperature, max_tokens, response_format, client, semaphore)
+    
+    return await in_flight.run_async(cache_key, fetch)
+
+async def _call_openai_chat_async(cache_key, system_message, user_message, model, temperature, max_tokens,
+                                  response_format, client, semaphore):
+    client = client or get_async_client()
+    if client is None:
+        if OPENAI_AVAILABLE and not os.getenv('OPENAI_API_KEY'):
+            print("  ⚠️  No OPENAI_API_KEY set, using fallback")
+        return get_fallback_response(system_message, user_message, response_format)
+    
+    request = chat_request(system_message, user_message, model, temperature, max_tokens, response_format)
+    estimate = estimate_tokens(system_message, user_message, max_tokens)
+    adaptive = semaphore if isinstance(semaphore, AdaptiveConcurrency) else None
+    
+    for attempt in range(MAX_ATTEMPTS):
+        async with semaphore or nullcontext():
+            await asyncio.sleep(rate_limiter.reserve(estimate))
+            try:
+                response = await client.chat.completions.create(**request)
+                result = response.choices[0].message.content.strip()
+                error = None
+            except Exception as e:
+                error = e
+        if error is None:
+            if adaptive is not None:
+                adaptive.succeeded()
+            rate_limiter.record_usage(estimate, _usage_tokens(response))
+            save_cached_response(cache_key, result)
+            return result
+        if adaptive is not None and _is_throttle(error):
+            adaptive.throttled()
+        delay = _retry_delay(error, attempt)
+        if delay is None:
+            print(f"  ⚠️  OpenAI call failed: {str(error)[:100]}")
+            return get_fallback_response(system_message, user_message, response_format)
+        await asyncio.sleep(delay)
+
+def get_fallback_response(system_message, user_message, response_format=None):
+    """
+    Fallback response when OpenAI is unavailable: None.
+
+    The prompt alone doesn't say enough about the persona for a useful text,
+    so callers fill missing fields per persona from the offline text engine
+    (src/generation/offline_text.py) instead.
+    """
+    return None
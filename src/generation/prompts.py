@@ -1,4 +1,6 @@
-﻿from typing import Dict
+﻿import json
+import re
+from typing import Dict, Optional
 
 SUMMARY_TEMPLATES = {
     'de': """Schreibe eine prägnante, professionelle Zusammenfassung (3–4 Sätze) auf Deutsch für eine/n {title} aus {canton} mit {experience} Jahren Berufserfahrung. Betone relevante technische Fähigkeiten und berufliche Erfolge.""",
@@ -12,18 +14,125 @@ SKILLS_TEMPLATES = {
     'it': """Elenca 6–8 competenze chiave (tecniche e trasversali) per un/una {title} con {experience} anni di esperienza in {industry}."""
 }
 
-def build_summary_prompt(persona) -> Dict[str,str]:
+def _experience(persona, experience):
+    return int(persona.experience_years) if experience is None else experience
+
+def build_summary_prompt(persona, experience=None) -> Dict[str,str]:
     tmpl = SUMMARY_TEMPLATES.get(persona.language.value, SUMMARY_TEMPLATES['de'])
     return {
         'system': 'You are a concise professional CV writer. Keep tone professional and neutral.',
-        'user': tmpl.format(title=persona.current_title, canton=persona.canton, experience=int(persona.experience_years))
+        'user': tmpl.format(title=persona.current_title, canton=persona.canton, experience=_experience(persona, experience))
     }
 
-def build_skills_prompt(persona) -> Dict[str,str]:
+def build_skills_prompt(persona, experience=None) -> Dict[str,str]:
     tmpl = SKILLS_TEMPLATES.get(persona.language.value, SKILLS_TEMPLATES['de'])
     return {
         'system': 'You are an expert HR specialist who lists relevant skills for CVs.',
-        'user': tmpl.format(title=persona.current_title, experience=int(persona.experience_years), industry=persona.industry)
+        'user': tmpl.format(title=persona.current_title, experience=_experience(persona, experience), industry=persona.industry)
     }
 
+COMBINED_TEMPLATES = {
+    'de': """Erstelle CV-Inhalte auf Deutsch für eine/n {title} aus {canton} mit {experience} Jahren Berufserfahrung in {industry}:
+- "summary": prägnante, professionelle Zusammenfassung (3–4 Sätze)
+- "skills": 6–8 zentrale Fähigkeiten (technische und Soft Skills)
+- "job_descriptions": je eine Beschreibung (1–2 Sätze) pro Stelle, in dieser Reihenfolge:
+{jobs}""",
+    'fr': """Rédige en français le contenu du CV d'un/une {title} de {canton} avec {experience} ans d'expérience dans {industry} :
+- "summary" : résumé professionnel concis (3–4 phrases)
+- "skills" : 6–8 compétences clés (techniques et transversales)
+- "job_descriptions" : une description (1–2 phrases) par poste, dans cet ordre :
+{jobs}""",
+    'it': """Scrivi in italiano i contenuti del CV di un/una {title} da {canton} con {experience} anni di esperienza in {industry}:
+- "summary": riassunto professionale conciso (3–4 frasi)
+- "skills": 6–8 competenze chiave (tecniche e trasversali)
+- "job_descriptions": una descrizione (1–2 frasi) per ogni posizione, in quest'ordine:
+{jobs}"""
+}
+
+# Structured-output schema for the combined request (OpenAI response_format)
+ENRICHMENT_RESPONSE_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'cv_enrichment',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'summary': {'type': 'string'},
+                'skills': {'type': 'array', 'items': {'type': 'string'}},
+                'job_descriptions': {'type': 'array', 'items': {'type': 'string'}},
+            },
+            'required': ['summary', 'skills', 'job_descriptions'],
+            'additionalProperties': False,
+        },
+    },
+}
+
+def build_enrichment_prompt(persona, experience=None, generic_jobs=False) -> Dict[str,str]:
+    """
+    One prompt for summary, skills and per-job descriptions, answered as JSON.
+
+    ``experience`` overrides the years shown (e.g. a range like "3–6") and
+    ``generic_jobs`` leaves out employers, so the prompt can be shared by a
+    whole parameter bucket (see variants.py).
+    """
+    tmpl = COMBINED_TEMPLATES.get(persona.language.value, COMBINED_TEMPLATES['de'])
+    jobs = '\n'.join(
+        f"{i}. {job.get('title', '')}{'' if generic_jobs else ', ' + str(job.get('company', ''))} "
+        f"({job.get('start_date', '')} – {job.get('end_date', '')})"
+        for i, job in enumerate(persona.career_history, 1)
+    )
+    return {
+        'system': 'You are a concise professional CV writer. Keep tone professional and neutral. '
+                  'Answer only with a JSON object with the keys "summary", "skills" and "job_descriptions".',
+        'user': tmpl.format(title=persona.current_title, canton=persona.canton, experience=_experience(persona, experience),
+                            industry=persona.industry, jobs=jobs or '-'),
+        'response_format': ENRICHMENT_RESPONSE_FORMAT,
+    }
+
+_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$', re.IGNORECASE)
+
+def _clean_text(value) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    return value or None
+
+def parse_enrichment_response(text: Optional[str], n_jobs: int = 0) -> Dict[str, object]:
+    """
+    Parse the combined response field by field.
+
+    Tolerates code fences and prose around the JSON object. A missing or
+    malformed field comes back as None (each job description individually),
+    so the caller can fall back per field instead of discarding the response.
+
+    Returns:
+        {'summary': str|None, 'skills': List[str]|None, 'job_descriptions': List[str|None]}
+    """
+    result = {'summary': None, 'skills': None, 'job_descriptions': [None] * n_jobs}
+    if not text:
+        return result
+    text = _FENCE_RE.sub('', text.strip())
+    start, end = text.find('{'), text.rfind('}')
+    if start < 0 or end <= start:
+        return result
+    try:
+        # strict=False accepts raw newlines inside strings, a common model slip
+        data = json.loads(text[start:end + 1], strict=False)
+    except ValueError:
+        return result
+    if not isinstance(data, dict):
+        return result
 
+    result['summary'] = _clean_text(data.get('summary'))
+    skills = data.get('skills')
+    if isinstance(skills, str):
+        skills = skills.splitlines()
+    if isinstance(skills, list):
+        skills = [s.strip('- ').strip() for s in skills if isinstance(s, str) and s.strip('- ').strip()]
+        result['skills'] = skills or None
+    descriptions = data.get('job_descriptions')
+    if isinstance(descriptions, list):
+        for i, desc in enumerate(descriptions[:n_jobs]):
+            result['job_descriptions'][i] = _clean_text(desc)
+    return result
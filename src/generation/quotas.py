@@ -0,0 +1,170 @@
+# src/generation/quotas.py
+"""
+Exact-quota stratified generation on top of SamplingEngine.
+
+Instead of drawing cantons and genders independently and hoping the
+marginals converge, the planner fixes the counts up front:
+
+1. canton and gender totals are allocated with the largest-remainder method,
+   so each marginal is exact (e.g. exactly 17.9% ZH of 10M, exactly 50/50);
+2. the canton x gender cells are filled canton by canton, splitting each
+   canton's total over the genders in proportion to the remaining gender
+   capacity (again largest remainder), which keeps both marginals exact;
+3. every non-empty cell is generated in one ``sample_personas`` batch with
+   canton and gender fixed.
+
+No rejection or re-generation loop is involved. Shares must sum to 1, so
+the planned marginals are the ones asked for; relative weights such as
+populations go through ``shares_from_weights`` first.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_GENDER_SHARES = {'male': 0.5, 'female': 0.5}
+# Allowed deviation of a share total from 1
+SHARE_TOLERANCE = 1e-6
+
+
+def largest_remainder(total: int, weights: Sequence[float]) -> List[int]:
+    """Split ``total`` into integers proportional to ``weights`` (Hamilton method)"""
+    w = np.asarray(weights, dtype=float)
+    if total <= 0 or w.sum() <= 0:
+        return [0] * len(w)
+    quotas = total * w / w.sum()
+    counts = np.floor(quotas).astype(np.int64)
+    short = total - int(counts.sum())
+    if short:
+        # Ties go to the earlier stratum, so the result is deterministic
+        order = np.argsort(-(quotas - counts), kind='stable')
+        counts[order[:short]] += 1
+    return counts.tolist()
+
+
+class QuotaPlan:
+    """
+    Per-stratum counts for one run.
+
+    Attributes:
+        total: Number of personas
+        canton_shares / gender_shares: Target shares (each summing to 1)
+        cells: {(canton, gender): count}, only non-empty cells
+    """
+
+    def __init__(self, total: int, canton_shares: Dict[str, float], gender_shares: Dict[str, float],
+                 cells: Dict[Tuple[str, str], int]):
+        self.total = total
+        self.canton_shares = canton_shares
+        self.gender_shares = gender_shares
+        self.cells = cells
+
+    def targets(self) -> List[Tuple[str, str, float, int]]:
+        """(dimension, value, target share, target count) for every stratum value"""
+        rows = []
+        for dim, shares, pos in (('canton', self.canton_shares, 0), ('gender', self.gender_shares, 1)):
+            for value, share in shares.items():
+                count = sum(c for key, c in self.cells.items() if key[pos] == value)
+                rows.append((dim, value, share, count))
+        return rows
+
+
+def shares_from_weights(weights: Dict[str, float]) -> Dict[str, float]:
+    """Scale relative weights (e.g. populations) to shares summing to 1"""
+    total = float(sum(weights.values()))
+    if total <= 0:
+        raise ValueError("Quota weights must sum to a positive number")
+    return {k: v / total for k, v in weights.items()}
+
+
+def _check_shares(shares: Dict[str, float], dimension: str) -> Dict[str, float]:
+    if any(v < 0 for v in shares.values()):
+        raise ValueError(f"Negative {dimension} share in {shares}")
+    total = float(sum(shares.values()))
+    if abs(total - 1) > SHARE_TOLERANCE:
+        raise ValueError(f"{dimension.capitalize()} shares sum to {total:.6g}, not 1; list every stratum "
+                         f"or scale relative weights with shares_from_weights()")
+    return dict(shares)
+
+
+def plan_quotas(total: int, canton_shares: Dict[str, float],
+                gender_shares: Optional[Dict[str, float]] = None) -> QuotaPlan:
+    """
+    Allocate ``total`` over canton x gender with exact marginals.
+
+    Raises:
+        ValueError: If the canton or gender shares do not sum to 1
+    """
+    canton_shares = _check_shares(canton_shares, 'canton')
+    gender_shares = _check_shares(gender_shares or DEFAULT_GENDER_SHARES, 'gender')
+    cantons, genders = list(canton_shares), list(gender_shares)
+    canton_counts = largest_remainder(total, [canton_shares[c] for c in cantons])
+    remaining = np.array(largest_remainder(total, [gender_shares[g] for g in genders]), dtype=np.int64)
+
+    cells = {}
+    for canton, count in zip(cantons, canton_counts):
+        # Splitting by remaining capacity never exceeds it, and the last
+        # canton takes exactly what is left, so both margins come out exact
+        split = largest_remainder(count, remaining) if count else [0] * len(genders)
+        remaining -= np.asarray(split, dtype=np.int64)
+        for gender, c in zip(genders, split):
+            if c:
+                cells[(canton, gender)] = c
+    return QuotaPlan(total, canton_shares, gender_shares, cells)
+
+
+def default_canton_shares(engine, joint: bool = False, cantons: Optional[Sequence[str]] = None) -> Dict[str, float]:
+    """Population shares from the engine's canton data (or the BFS table in joint mode)"""
+    if joint:
+        weights = engine.joint_sampler.table.canton_weights()
+    else:
+        weights = dict(zip(engine.data.canton_codes, engine.data.canton_weights))
+    if cantons:
+        weights = {c: weights[c] for c in cantons if c in weights}
+    return shares_from_weights(weights)
+
+
+def generate_stratified(engine, plan: QuotaPlan, seed=None, preferred_industry=None, as_dict=False,
+                        joint: bool = False, shuffle: bool = True):
+    """
+    Generate exactly ``plan.total`` personas, one batch per non-empty cell.
+
+    Returns:
+        List of SwissPersona (or dict rows), shuffled unless ``shuffle=False``
+    """
+    known = engine.joint_sampler.cantons if joint else engine.data.canton_codes
+    unknown = sorted({c for c, _ in plan.cells} - set(known))
+    if unknown:
+        raise ValueError(f"No canton data for quota strata: {', '.join(unknown)}")
+    ss = np.random.SeedSequence(seed)
+    cell_seeds = ss.spawn(len(plan.cells) + 1)
+    personas = []
+    for ((canton, gender), count), cell_seed in zip(plan.cells.items(), cell_seeds):
+        personas.extend(engine.sample_personas(
+            count, seed=cell_seed, preferred_canton=canton, preferred_industry=preferred_industry,
+            as_dict=as_dict, joint=joint, gender=gender))
+    if shuffle:
+        order = np.random.default_rng(cell_seeds[-1]).permutation(len(personas))
+        personas = [personas[i] for i in order.tolist()]
+    return personas
+
+
+def quota_report(plan: QuotaPlan, personas) -> List[Dict]:
+    """Achieved vs target counts and shares per canton and gender"""
+    achieved = {}
+    for p in personas:
+        canton = p['canton'] if isinstance(p, dict) else p.canton
+        gender = p['gender'] if isinstance(p, dict) else p.gender
+        achieved[('canton', canton)] = achieved.get(('canton', canton), 0) + 1
+        achieved[('gender', gender)] = achieved.get(('gender', gender), 0) + 1
+    n = max(len(personas), 1)
+    return [
+        {
+            'dimension': dim,
+            'value': value,
+            'target_share': share,
+            'target_count': count,
+            'achieved_count': achieved.get((dim, value), 0),
+            'achieved_share': achieved.get((dim, value), 0) / n,
+        }
+        for dim, value, share, count in plan.targets()
+    ]
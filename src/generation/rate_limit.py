@@ -0,0 +1,157 @@
+# src/generation/rate_limit.py
+"""
+Client-side rate limiting and backoff for LLM requests.
+
+- TokenBucket / RateLimiter: requests-per-minute and tokens-per-minute
+  budgets. Callers reserve capacity and sleep for the returned delay, so
+  concurrent callers queue fairly instead of bursting into 429s.
+- backoff_delay / retry_after_seconds: exponential backoff with full jitter
+  that defers to the server's Retry-After hint when there is one.
+- AdaptiveConcurrency: AIMD limit on requests in flight for asyncio. It grows
+  by one slot per window of successes and halves on throttling (at most once
+  per cooldown).
+"""
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Burst allowance of a bucket, in seconds of its rate
+BURST_SECONDS = 6.0
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """
+        Take ``amount`` from the bucket and return how long to wait before using it.
+
+        The balance may go negative: later callers then wait behind earlier
+        ones, in arrival order.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, amount: float):
+        """Charge (positive) or refund (negative) the difference to an earlier estimate"""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        """Either limit may be None (unlimited)"""
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request and ``tokens`` tokens; returns the delay before sending"""
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+    def record_usage(self, estimated: int, actual: Optional[int]):
+        """Correct the token reservation once the response reports real usage"""
+        if self.tokens is not None and actual is not None:
+            self.tokens.adjust(actual - estimated)
+
+
+def estimate_tokens(system_message: str, user_message: str, max_tokens: int) -> int:
+    """Rough token count of a request (~4 characters per prompt token plus the completion budget)"""
+    return (len(system_message) + len(user_message)) // 4 + max_tokens
+
+
+def retry_after_seconds(exc) -> Optional[float]:
+    """Server-requested delay from the error's Retry-After(-ms) header, if any"""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None, base: float = 1.0, cap: float = 60.0) -> float:
+    """
+    Delay before retry number ``attempt`` (0-based).
+
+    Honors ``retry_after`` (plus a little jitter so waiters don't return in
+    lockstep); otherwise full jitter over an exponentially growing window.
+    """
+    if retry_after is not None:
+        return min(cap, retry_after) + random.uniform(0, base / 4)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class AdaptiveConcurrency:
+    def __init__(self, maximum: int, minimum: int = 1, initial: Optional[int] = None,
+                 decrease: float = 0.5, cooldown: float = 5.0):
+        """
+        Args:
+            maximum: Upper bound on requests in flight
+            minimum: Lower bound the limit never drops below
+            initial: Starting limit (default: maximum)
+            decrease: Factor applied to the limit on throttling
+            cooldown: Seconds between two decreases (one burst of 429s counts once)
+        """
+        self.maximum = maximum
+        self.minimum = max(1, minimum)
+        self.limit = float(initial or maximum)
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = float('-inf')
+        self._condition = None
+
+    async def __aenter__(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def succeeded(self):
+        """Additive increase: about +1 slot per ``limit`` successes"""
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def throttled(self):
+        """Multiplicative decrease, at most once per cooldown"""
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self.limit = max(self.minimum, self.limit * self.decrease)
+            self._last_decrease = now
@@ -1,8 +1,37 @@
 ﻿# src/generation/sampling.py
-import random, os, csv
+import random, os, threading
+from bisect import bisect_left
+from itertools import accumulate
 from datetime import date
-from src.data.loader import load_cantons_json, load_companies_json, load_occupations_json
-from src.data.models import SwissPersona, Language
+import numpy as np
+from src.data.loader import load_swiss_data, canton_language_probs, data_file_paths
+from src.data.bundle import load_swiss_data_cached
+from src.data.demographics import CANTON_LANGUAGES
+from src.data.models import SwissPersona, CantonInfo, Language
+from src.generation.joint_sampling import JointDemographicSampler
+from src.generation.seeding import SEED_BLOCK_SIZE, block_seed, blocks_for_range, persona_rng, root_seed
+from src.utils import gc_paused
+
+GENDERS = ['male', 'female', 'other']
+FALLBACK_SURNAMES = ['Müller', 'Meier', 'Schmid', 'Bianchi']
+FALLBACK_FIRST_NAMES = ['Luca', 'Anna', 'Marco', 'Sophie']
+FALLBACK_COMPANY = 'Acme AG'
+FALLBACK_CANTON = CantonInfo(code='ZH', name='Zürich', population=1000000, primary_language='de')
+
+# Relative weight of a company by CompanyInfo.size_band (rough headcount midpoint),
+# so personas are spread over employers roughly like the workforce is
+SIZE_BAND_WEIGHTS = {'1-10': 5, '11-50': 30, '50-250': 150, '250+': 500}
+DEFAULT_SIZE_WEIGHT = SIZE_BAND_WEIGHTS['11-50']
+
+def _persona_from_row(row):
+    """
+    SwissPersona from a _persona_row dict without re-validating it.
+
+    The rows are valid by construction, and validation dominates the cost of
+    bulk generation; only the types validation would coerce are converted.
+    """
+    return SwissPersona.model_construct(**dict(
+        row, language=Language(row['language']), experience_years=float(row['experience_years'])))
 
 def weighted_choice(items, weights):
     total = sum(weights)
@@ -14,67 +43,152 @@ def weighted_choice(items, weights):
         upto += w
     return items[-1]
 
-def load_name_csv(path):
-    names, weights = [], []
-    if not os.path.exists(path):
-        return names, weights
-    with open(path, newline='', encoding='utf-8') as fh:
-        reader = csv.DictReader(fh)
-        for r in reader:
-            nm = r.get('name') or r.get('Name') or r.get('vorname') or next(iter(r.values()))
-            freq = r.get('frequency') or r.get('freq') or r.get('anzahl') or r.get('count') or '1'
-            try:
-                w = int(freq)
-            except:
-                w = 1
-            names.append(nm)
-            weights.append(w)
-    return names, weights
+class WeightedTable:
+    """Prefix-sum table for repeated weighted draws from a fixed pool.
+
+    Built once per pool; each draw is a single ``random()`` call plus a
+    bisect over the cumulative weights, i.e. O(log n) instead of the O(n)
+    walk in ``weighted_choice``.  For the same random stream it returns
+    exactly the same item as ``weighted_choice(items, weights)``.
+    """
+
+    def __init__(self, items, weights):
+        self.items = list(items)
+        self.cum_weights = list(accumulate(weights))
+        self.total = self.cum_weights[-1] if self.cum_weights else 0
+        self._cum_array = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def sample(self, rng=random):
+        r = rng.random() * self.total
+        i = bisect_left(self.cum_weights, r)
+        if i >= len(self.items):
+            return self.items[-1]
+        return self.items[i]
+
+    def sample_indices(self, gen, n):
+        """Draw n item indices at once from a numpy Generator"""
+        if self._cum_array is None:
+            self._cum_array = np.asarray(self.cum_weights, dtype=float)
+        idx = np.searchsorted(self._cum_array, gen.random(n) * self.total, side='left')
+        return np.minimum(idx, len(self.items) - 1)
 
 class SamplingEngine:
-    def __init__(self, data_dir='data'):
-        self.cantons = load_cantons_json(os.path.join(data_dir, 'cantons.json'))
-        self.companies = load_companies_json(os.path.join(data_dir, 'companies.json'))
-        try:
-            self.occupations = load_occupations_json(os.path.join(data_dir, 'occupations.json'))
-        except:
-            self.occupations = []
-        self.surnames, self.surname_weights = load_name_csv(os.path.join(data_dir, 'surnames.csv'))
-        self.names_de, self.names_de_weights = load_name_csv(os.path.join(data_dir, 'names_de.csv'))
-        self.names_fr, self.names_fr_weights = load_name_csv(os.path.join(data_dir, 'names_fr.csv'))
-        self.names_it, self.names_it_weights = load_name_csv(os.path.join(data_dir, 'names_it.csv'))
-
-    def sample_canton(self):
-        if not self.cantons:
-            return {'code': 'ZH', 'population': 1000000}
-        weights = []
-        for c in self.cantons:
-            if isinstance(c, dict):
-                weights.append(c.get('population', 50000))
-            else:
-                weights.append(getattr(c, 'population', 50000))
-        return weighted_choice(self.cantons, weights)
+    def __init__(self, data_dir='data', use_bundle=True):
+        self.data_dir = data_dir
+        # The compiled bundle (src/data/bundle.py) skips JSON/CSV parsing when fresh
+        self.data = load_swiss_data_cached(data_dir) if use_bundle else load_swiss_data(data_dir)
+        self.canton_by_code = self.data.cantons
+        self.cantons = list(self.data.cantons.values())
+        self.occupation_by_code = self.data.occupations
+        self.occupations = list(self.data.occupations.values())
+        self.surnames, self.surname_weights = self.data.names['surnames']
+        self.names_de, self.names_de_weights = self.data.names['de']
+        self.names_fr, self.names_fr_weights = self.data.names['fr']
+        self.names_it, self.names_it_weights = self.data.names['it']
+        self._joint_sampler = None
+        with gc_paused():  # table building allocates many acyclic lists
+            self._build_tables()
 
-    def sample_language_for_canton(self, canton):
-        if isinstance(canton, dict):
-            primary_lang = canton.get('primary_language', 'de')
-        else:
-            primary_lang = getattr(canton, 'primary_language', 'de')
-        
-        probs = {primary_lang: 0.9}
-        for l in ['de', 'fr', 'it']:
-            if l != primary_lang:
-                probs[l] = probs.get(l, 0.05)
-        langs = list(probs.keys())
-        weights = list(probs.values())
-        return weighted_choice(langs, weights)
-
-    def sample_age(self, min_age=20, max_age=65):
-        return random.randint(min_age, max_age)
-
-    def age_to_experience(self, age, education_end_age=22, variance=2.0):
+    @property
+    def companies(self):
+        return self.data.companies
+
+    @property
+    def joint_sampler(self):
+        """BFS canton x sex x nationality x age sampler, built on first use"""
+        if self._joint_sampler is None:
+            self._joint_sampler = JointDemographicSampler.from_data_dir(self.data_dir)
+        return self._joint_sampler
+
+    def language_table(self, canton_code):
+        """Language table for a canton; cantons missing from data/ use their BFS primary language"""
+        table = self.language_tables.get(canton_code)
+        if table is None:
+            canton = CantonInfo(code=canton_code, name=canton_code, population=0,
+                                primary_language=CANTON_LANGUAGES.get(canton_code, 'de'))
+            table = self.language_tables[canton_code] = WeightedTable(*canton_language_probs(canton))
+        return table
+
+    def _build_tables(self):
+        """Precompute weighted sampling tables for the name and canton pools"""
+        self.surname_table = WeightedTable(self.surnames, self.surname_weights)
+        self.first_name_tables = {
+            'de': WeightedTable(self.names_de, self.names_de_weights),
+            'fr': WeightedTable(self.names_fr, self.names_fr_weights),
+            'it': WeightedTable(self.names_it, self.names_it_weights),
+        }
+        self.first_name_table_all = WeightedTable(
+            self.names_de + self.names_fr + self.names_it,
+            self.names_de_weights + self.names_fr_weights + self.names_it_weights,
+        )
+        self.canton_table = WeightedTable(self.cantons, self.data.canton_weights)
+        self.language_tables = {
+            code: WeightedTable(langs, probs) for code, (langs, probs) in self.data.language_probs.items()
+        }
+        self.language_tables.setdefault(FALLBACK_CANTON.code, WeightedTable(*canton_language_probs(FALLBACK_CANTON)))
+        self._build_company_index()
+
+    def _build_company_index(self):
+        """
+        Index companies once by (industry, canton), industry and canton.
+
+        Each bucket is a WeightedTable weighted by size band, so a lookup is a
+        few dict hits and a draw is a bisect; no per-persona scan.
+        """
+        # One pass over the registry into (industry, canton) buckets; the coarser
+        # levels are concatenations of those few buckets
+        pairs = {}
+        for name, canton, industry, size_band in zip(*self.data.company_columns):
+            if not name:
+                continue
+            bucket = pairs.get((industry, canton))
+            if bucket is None:
+                bucket = pairs[(industry, canton)] = ([], [])
+            bucket[0].append(name)
+            bucket[1].append(SIZE_BAND_WEIGHTS.get(size_band, DEFAULT_SIZE_WEIGHT))
+        levels = ({}, {}, {}, {})
+        for (industry, canton), (names, weights) in pairs.items():
+            industry = industry.casefold()
+            for level, key in zip(levels, ((industry, canton), industry, canton, None)):
+                merged = level.setdefault(key, ([], []))
+                merged[0].extend(names)
+                merged[1].extend(weights)
+        self.company_index, self.company_by_industry, self.company_by_canton, everything = (
+            {key: WeightedTable(names, weights) for key, (names, weights) in level.items()} for level in levels)
+        self.company_table_all = everything.get(None, WeightedTable([], []))
+
+    def company_table(self, industry, canton_code):
+        """Resolve the company pool: industry+canton -> industry -> canton -> all"""
+        industry = (industry or '').casefold()
+        return (self.company_index.get((industry, canton_code))
+                or self.company_by_industry.get(industry)
+                or self.company_by_canton.get(canton_code)
+                or self.company_table_all)
+
+    def sample_company(self, industry, canton_code, rng=random):
+        table = self.company_table(industry, canton_code)
+        return table.sample(rng) if table else FALLBACK_COMPANY
+
+    def sample_canton(self, rng=random):
+        if not self.canton_table:
+            return FALLBACK_CANTON
+        return self.canton_table.sample(rng)
+
+    def sample_language_for_canton(self, canton, rng=random):
+        return self.language_table(canton.code).sample(rng)
+
+    def sample_age(self, min_age=20, max_age=65, rng=random):
+        return rng.randint(min_age, max_age)
+
+    def age_to_experience(self, age, education_end_age=22, variance=2.0, rng=random):
         base = max(0, age - education_end_age)
-        var = int(random.gauss(0, variance))
+        var = int(rng.gauss(0, variance))
         return max(0, base + var)
 
     def career_level_from_experience(self, experience, industry):
@@ -84,83 +198,261 @@ class SamplingEngine:
             return 'Mid'
         return 'Senior'
 
-    def sample_name(self, language, gender=None):
-        surname = weighted_choice(self.surnames, self.surname_weights) if self.surnames else random.choice(['Müller', 'Meier', 'Schmid', 'Bianchi'])
+    def sample_name(self, language, gender=None, rng=random):
+        surname = self.surname_table.sample(rng) if self.surname_table else rng.choice(FALLBACK_SURNAMES)
         
-        if language == 'de' and self.names_de:
-            first = weighted_choice(self.names_de, self.names_de_weights)
-        elif language == 'fr' and self.names_fr:
-            first = weighted_choice(self.names_fr, self.names_fr_weights)
-        elif language == 'it' and self.names_it:
-            first = weighted_choice(self.names_it, self.names_it_weights)
+        table = self.first_name_tables.get(language)
+        if table:
+            first = table.sample(rng)
         else:
-            pool = (self.names_de + self.names_fr + self.names_it)
-            w = (self.names_de_weights + self.names_fr_weights + self.names_it_weights)
-            first = weighted_choice(pool, w) if pool else random.choice(['Luca', 'Anna', 'Marco', 'Sophie'])
+            table = self.first_name_table_all
+            first = table.sample(rng) if table else rng.choice(FALLBACK_FIRST_NAMES)
         
         return first, surname
 
-    def sample_persona(self, preferred_canton=None, preferred_industry=None):
-        canton = None
-        
+    def sample_persona(self, preferred_canton=None, preferred_industry=None, rng=None):
+        """
+        Sample one skeleton persona.
+
+        ``rng`` is a ``random.Random`` (e.g. ``persona_rng(seed, i)``) to draw
+        from instead of the global ``random`` module, which makes the persona
+        independent of call order.
+        """
+        rng = rng or random
         # Select canton
-        if preferred_canton and preferred_canton != 'all':
-            for c in self.cantons:
-                c_code = c.get('code') if isinstance(c, dict) else getattr(c, 'code', None)
-                if c_code == preferred_canton:
-                    canton = c
-                    break
-        
-        if not canton:
-            canton = self.sample_canton()
-        
-        # Get canton code (handle both dict and object)
-        canton_code = canton.get('code') if isinstance(canton, dict) else getattr(canton, 'code', 'ZH')
-        if not canton_code:
-            canton_code = 'ZH'
+        canton = self.canton_by_code.get(preferred_canton) if preferred_canton else None
+        if canton is None:
+            canton = self.sample_canton(rng)
+        canton_code = canton.code
         
         # Sample language
-        language = self.sample_language_for_canton(canton)
+        language = self.sample_language_for_canton(canton, rng)
         
         # Sample age and experience
-        age = self.sample_age()
-        exp = self.age_to_experience(age)
+        age = self.sample_age(rng=rng)
+        exp = self.age_to_experience(age, rng=rng)
         
         # Select industry
         industry = preferred_industry or 'technology'
         
         # Select company
-        possible_companies = [c for c in self.companies if c.get('industry') == industry and c.get('canton') == canton_code]
-        company = possible_companies[0].get('name') if possible_companies else (self.companies[0].get('name') if self.companies else 'Acme AG')
+        company = self.sample_company(industry, canton_code, rng)
         
         # Sample name
-        first, surname = self.sample_name(language)
-        full = f"{first} {surname}"
+        first, surname = self.sample_name(language, rng=rng)
+        gender = rng.choice(GENDERS)
+        phone = f"07{rng.randint(60, 99)}{rng.randint(100000, 999999)}"
         
-        persona = SwissPersona(
-            first_name=first,
-            last_name=surname,
-            full_name=full,
-            canton=canton_code,
-            language=language,
-            age=age,
-            birth_year=date.today().year - age,
-            gender=random.choice(['male', 'female', 'other']),
-            experience_years=exp,
-            industry=industry,
-            current_title=f"{self.career_level_from_experience(exp, industry)} {industry.capitalize()}",
-            career_history=[{
-                'title': f"{self.career_level_from_experience(exp, industry)} {industry}",
+        row = self._persona_row(first, surname, canton_code, language, age, exp, gender, None, industry, company, phone, date.today().year)
+        return SwissPersona(**row)
+
+    def sample_persona_at(self, seed, index, preferred_canton=None, preferred_industry=None):
+        """Persona ``index`` of the run seeded with ``seed``; identical wherever it is generated"""
+        return self.sample_persona(preferred_canton, preferred_industry, rng=persona_rng(seed, index))
+
+    def _persona_row(self, first, surname, canton_code, language, age, exp, gender, nationality, industry, company, phone, current_year):
+        """Assemble the SwissPersona fields shared by the scalar and batch paths"""
+        level = self.career_level_from_experience(exp, industry)
+        return {
+            'first_name': first,
+            'last_name': surname,
+            'full_name': f"{first} {surname}",
+            'canton': canton_code,
+            'language': language,
+            'age': age,
+            'birth_year': current_year - age,
+            'gender': gender,
+            'nationality': nationality,
+            'experience_years': exp,
+            'industry': industry,
+            'current_title': f"{level} {industry.capitalize()}",
+            'career_history': [{
+                'title': f"{level} {industry}",
                 'company': company,
                 'start_date': '2018-01',
                 'end_date': '2022-12',
                 'desc': 'Worked on projects.'
             }],
-            email=f"{first.lower()}.{surname.lower()}@example.ch",
-            phone=f"07{random.randint(60, 99)}{random.randint(100000, 999999)}",
-            skills=['Problem solving', 'Software development'],
-            summary=None,
-            photo_path=None
-        )
+            'email': f"{first.lower()}.{surname.lower()}@example.ch",
+            'phone': phone,
+            'skills': ['Problem solving', 'Software development'],
+            'summary': None,
+            'photo_path': None,
+        }
+
+    def sample_personas(self, n, seed=None, preferred_canton=None, preferred_industry=None, as_dict=False,
+                        joint=False, age_range=None, gender=None):
+        """
+        Sample n skeleton personas in one vectorized pass.
+
+        Canton, language, age, experience, gender, names and phone numbers are
+        drawn as NumPy arrays from a seeded ``numpy.random.Generator``; persona
+        objects (or plain dict rows with ``as_dict=True``) are only built at the
+        end.  Distributions match ``sample_persona``.
+
+        With ``joint=True`` canton, sex, nationality and age are drawn together
+        from the BFS population tables (see joint_sampling.py) instead of
+        independently; canton, age and gender filters are then applied to the
+        precomputed tables rather than by rejection.
+
+        Args:
+            n: Number of personas
+            seed: Seed (or SeedSequence) for ``numpy.random.default_rng``
+            preferred_canton: Canton code to fix, or None/'all' to sample
+            preferred_industry: Industry to fix (default: technology)
+            as_dict: Return dict rows instead of SwissPersona objects
+            joint: Sample canton/sex/nationality/age from BFS tables
+            age_range: Optional inclusive (min_age, max_age)
+            gender: Optional gender to fix ('male'/'female' in joint mode)
+
+        Returns:
+            List of SwissPersona (or dict) of length n
+        """
+        gen = np.random.default_rng(seed)
+        industry = preferred_industry or 'technology'
+        min_age, max_age = age_range or (20, 65)
+        
+        # Canton index per persona (into canton_codes)
+        nationalities = nationality_idx = None
+        if joint:
+            sampler = self.joint_sampler
+            draws = sampler.sample(
+                n, gen,
+                cantons=[preferred_canton] if preferred_canton and preferred_canton != 'all' else None,
+                sexes=[gender] if gender else None,
+                age_range=age_range,
+            )
+            canton_codes = sampler.cantons
+            canton_idx = draws['canton']
+        else:
+            canton_codes = self.data.canton_codes or [FALLBACK_CANTON.code]
+            if preferred_canton in self.canton_by_code:
+                canton_idx = np.full(n, canton_codes.index(preferred_canton), dtype=np.intp)
+            elif self.canton_table:
+                canton_idx = self.canton_table.sample_indices(gen, n)
+            else:
+                canton_idx = np.zeros(n, dtype=np.intp)
+        canton_langs = [self.language_table(code) for code in canton_codes]
+        
+        # Language and company, drawn per canton group
+        lang_values = sorted({l for t in canton_langs for l in t.items})
+        lang_idx = np.empty(n, dtype=np.intp)
+        companies = np.empty(n, dtype=object)
+        for k in np.unique(canton_idx).tolist():
+            mask = canton_idx == k
+            table = canton_langs[k]
+            lookup = np.array([lang_values.index(l) for l in table.items])
+            lang_idx[mask] = lookup[table.sample_indices(gen, int(mask.sum()))]
+            companies_table = self.company_table(industry, canton_codes[k])
+            if companies_table:
+                companies[mask] = np.asarray(companies_table.items, dtype=object)[companies_table.sample_indices(gen, int(mask.sum()))]
+            else:
+                companies[mask] = FALLBACK_COMPANY
+        
+        # Age, experience, gender, phone
+        if joint:
+            ages = draws['age']
+        else:
+            ages = gen.integers(min_age, max_age + 1, n)
+        exps = np.maximum(0, np.maximum(0, ages - 22) + np.trunc(gen.normal(0, 2.0, n)).astype(np.int64))
+        if joint:
+            gender_values, genders = sampler.sexes, draws['sex']
+            nationalities, nationality_idx = sampler.nationalities, draws['nationality'].tolist()
+        elif gender:
+            gender_values, genders = [gender], np.zeros(n, dtype=np.intp)
+        else:
+            gender_values, genders = GENDERS, gen.integers(0, len(GENDERS), n)
+        phone_a = gen.integers(60, 100, n)
+        phone_b = gen.integers(100000, 1000000, n)
+        
+        # Names
+        if self.surname_table:
+            surnames = np.asarray(self.surname_table.items, dtype=object)[self.surname_table.sample_indices(gen, n)]
+        else:
+            surnames = np.asarray(FALLBACK_SURNAMES, dtype=object)[gen.integers(0, len(FALLBACK_SURNAMES), n)]
+        firsts = np.empty(n, dtype=object)
+        for j, lang in enumerate(lang_values):
+            mask = lang_idx == j
+            count = int(mask.sum())
+            if not count:
+                continue
+            table = self.first_name_tables.get(lang) or self.first_name_table_all
+            if table:
+                firsts[mask] = np.asarray(table.items, dtype=object)[table.sample_indices(gen, count)]
+            else:
+                firsts[mask] = np.asarray(FALLBACK_FIRST_NAMES, dtype=object)[gen.integers(0, len(FALLBACK_FIRST_NAMES), count)]
         
-        return persona
+        # Materialize; the cyclic GC only adds overhead while allocating millions of
+        # acyclic row dicts, so it is paused for the duration
+        current_year = date.today().year
+        with gc_paused():
+            rows = [
+                self._persona_row(first, surname, canton_codes[k], lang_values[l], age, exp, gender_values[g],
+                                  nationalities[nat] if nationalities else None, industry,
+                                  company, f"07{pa}{pb}", current_year)
+                for first, surname, k, l, age, exp, g, nat, company, pa, pb in zip(
+                    firsts.tolist(), surnames.tolist(), canton_idx.tolist(), lang_idx.tolist(), ages.tolist(),
+                    exps.tolist(), genders.tolist(), nationality_idx or [None] * n, companies.tolist(),
+                    phone_a.tolist(), phone_b.tolist())
+            ]
+        if as_dict:
+            return rows
+        return [_persona_from_row(row) for row in rows]
+
+    def sample_personas_range(self, start, stop, seed, as_dict=False, block_size=SEED_BLOCK_SIZE, **kwargs):
+        """
+        Personas with global indices [start, stop) of the run seeded with ``seed``.
+
+        Indices are grouped into fixed blocks of ``block_size``, each drawn with
+        ``sample_personas`` from its own seed (see seeding.py). A shard, worker
+        or re-run covering the same indices therefore gets the same rows, however
+        the full run is split up. Other keyword arguments go to ``sample_personas``.
+        """
+        seed = root_seed(seed)  # one root, so seed=None still gives a coherent run
+        rows = []
+        for block, lo, hi in blocks_for_range(start, stop, block_size):
+            rows.extend(self.sample_personas(block_size, seed=block_seed(seed, block), as_dict=True, **kwargs)[lo:hi])
+        if as_dict:
+            return rows
+        return [_persona_from_row(row) for row in rows]
+
+
+# Process-wide engine cache: one engine per data directory, rebuilt when any
+# source file changes (by mtime) or on explicit reload
+_engines = {}
+_engines_lock = threading.Lock()
+
+def _data_signature(data_dir):
+    sig = []
+    for path in data_file_paths(data_dir):
+        try:
+            sig.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+def get_engine(data_dir='data', reload=False):
+    """
+    Return the shared SamplingEngine for ``data_dir``, building it on first use.
+
+    The engine is cached per process, keyed by the absolute data directory and
+    the mtimes of its source files, so edits to data/ are picked up without
+    restarting. Pass ``reload=True`` to force a rebuild.
+    """
+    key = os.path.abspath(data_dir)
+    sig = _data_signature(data_dir)
+    with _engines_lock:
+        cached = _engines.get(key)
+        if reload or cached is None or cached[0] != sig:
+            cached = (sig, SamplingEngine(data_dir))
+            _engines[key] = cached
+        return cached[1]
+
+def reload_engine(data_dir='data'):
+    """Rebuild the cached engine for ``data_dir`` from disk"""
+    return get_engine(data_dir, reload=True)
+
+def clear_engine_cache():
+    """Drop all cached engines"""
+    with _engines_lock:
+        _engines.clear()
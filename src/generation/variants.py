@@ -0,0 +1,124 @@
+# src/generation/variants.py
+"""
+Parameter-bucketed variant pools for LLM text.
+
+The enrichment prompts only depend on language, title, canton, experience and
+industry, so a large batch contains comparatively few distinct prompts. A
+VariantPool maps each persona to a bucket (experience binned into ranges,
+employers left out of the prompt) and to one of K variants of that bucket.
+Variants are cached under the same prompt with the variant number in the
+cache key (see get_cache_key).
+
+``pregenerate`` fills all K variants of every bucket in a batch up front, so
+LLM calls scale with buckets x K instead of with personas. Which variant a
+persona gets is a stable hash of the persona, so reruns pick the same text.
+"""
+import asyncio
+import hashlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.generation.openai_client import (
+    aclose_async_client, call_openai_chat_async, get_async_client, get_cache_key, get_cached_response,
+)
+from src.generation.prompts import build_enrichment_prompt, build_skills_prompt, build_summary_prompt
+from src.generation.rate_limit import AdaptiveConcurrency
+
+# Inclusive (min, max) years; None = open-ended
+DEFAULT_EXPERIENCE_BINS: Tuple[Tuple[int, Optional[int]], ...] = ((0, 2), (3, 6), (7, 14), (15, 24), (25, None))
+
+
+def parse_experience_bins(spec: str) -> Tuple[Tuple[int, Optional[int]], ...]:
+    """Parse "0-2,3-6,7-14,15+" into ((0, 2), (3, 6), (7, 14), (15, None))"""
+    bins = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if part.endswith('+'):
+            bins.append((int(part[:-1]), None))
+        else:
+            lo, _, hi = part.partition('-')
+            bins.append((int(lo), int(hi or lo)))
+    if not bins:
+        raise ValueError(f"No experience bins in {spec!r}")
+    return tuple(sorted(bins))
+
+
+def experience_label(years: float, bins: Sequence[Tuple[int, Optional[int]]] = DEFAULT_EXPERIENCE_BINS) -> str:
+    """Range label of the bin containing ``years``, e.g. "3–6" or "25+" """
+    years = int(years)
+    for lo, hi in bins:
+        if years >= lo and (hi is None or years <= hi):
+            return f"{lo}+" if hi is None else (str(lo) if lo == hi else f"{lo}–{hi}")
+    # Outside all bins: the value itself is its own bucket
+    return str(years)
+
+
+class VariantPool:
+    def __init__(self, k: int, experience_bins: Sequence[Tuple[int, Optional[int]]] = DEFAULT_EXPERIENCE_BINS):
+        """
+        Args:
+            k: Variants per bucket
+            experience_bins: Inclusive (min, max) year ranges; max None = open-ended
+        """
+        if k < 1:
+            raise ValueError("A variant pool needs at least one variant per bucket")
+        self.k = k
+        self.experience_bins = tuple(experience_bins)
+
+    def bucket(self, persona) -> Tuple[str, str, str, str, str]:
+        """(language, title, canton, experience range, industry) of a persona"""
+        return (persona.language.value, persona.current_title, persona.canton,
+                experience_label(persona.experience_years, self.experience_bins), persona.industry)
+
+    def variant(self, persona) -> int:
+        """Variant number for ``persona``: stable, roughly uniform over 0..k-1"""
+        identity = f"{persona.full_name}|{persona.email}|{persona.phone}|{persona.age}"
+        return int.from_bytes(hashlib.sha256(identity.encode('utf-8')).digest()[:8], 'little') % self.k
+
+    def requests(self, persona, combined: bool = True, variant: Optional[int] = None) -> List[Dict]:
+        """Bucket-level chat requests (call_openai_chat keyword dicts) for ``persona``"""
+        variant = self.variant(persona) if variant is None else variant
+        experience = experience_label(persona.experience_years, self.experience_bins)
+        if combined:
+            prompt = build_enrichment_prompt(persona, experience=experience, generic_jobs=True)
+            return [{'system_message': prompt['system'], 'user_message': prompt['user'],
+                     'response_format': prompt['response_format'], 'variant': variant}]
+        return [{'system_message': prompt['system'], 'user_message': prompt['user'], 'variant': variant}
+                for prompt in (build_summary_prompt(persona, experience), build_skills_prompt(persona, experience))]
+
+    def pending_requests(self, personas, combined: bool = True) -> List[Dict]:
+        """All K variants of every bucket in ``personas`` that are not cached yet, deduplicated"""
+        todo = {}
+        seen = set()
+        for p in personas:
+            bucket = self.bucket(p)
+            if bucket in seen:
+                continue
+            seen.add(bucket)
+            for variant in range(self.k):
+                for request in self.requests(p, combined, variant):
+                    key = get_cache_key(request['system_message'], request['user_message'], variant=variant)
+                    if key not in todo and get_cached_response(key) is None:
+                        todo[key] = request
+        return list(todo.values())
+
+    async def pregenerate_async(self, personas, concurrency: int = 8, combined: bool = True) -> int:
+        """Generate missing variants with at most ``concurrency`` requests in flight; returns the count"""
+        todo = self.pending_requests(personas, combined)
+        if todo:
+            semaphore = AdaptiveConcurrency(concurrency)
+            client = get_async_client()
+            await asyncio.gather(*(call_openai_chat_async(**request, client=client, semaphore=semaphore)
+                                   for request in todo))
+        return len(todo)
+
+    def pregenerate(self, personas, concurrency: int = 8, combined: bool = True) -> int:
+        """Sync wrapper around pregenerate_async"""
+        async def run():
+            try:
+                return await self.pregenerate_async(personas, concurrency, combined)
+            finally:
+                await aclose_async_client()
+
+        return asyncio.run(run())
@@ -1,27 +1,152 @@
 ﻿from src.data.models import SwissPersona
-from src.generation.sampling import SamplingEngine
-from src.generation.openai_client import call_openai_chat
-from src.generation.prompts import build_summary_prompt, build_skills_prompt
+from src.generation.sampling import get_engine
+from src.generation.openai_client import (
+    aclose_async_client, call_openai_chat, call_openai_chat_async, get_async_client, get_cache_key,
+    get_cached_response,
+)
+from src.generation.offline_text import get_text_engine
+from src.generation.prompts import (
+    build_summary_prompt, build_skills_prompt, build_enrichment_prompt, parse_enrichment_response,
+)
+import asyncio
+from collections import deque
+from src.generation.rate_limit import AdaptiveConcurrency
 
-engine = SamplingEngine()
+def __getattr__(name):
+    # `engine` used to be built at import time; keep it reachable, but lazily
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def build_persona(preferred_canton: str = None, preferred_industry: str = None) -> SwissPersona:
-    p = engine.sample_persona(preferred_canton, preferred_industry)
+def build_persona(preferred_canton: str = None, preferred_industry: str = None, rng=None) -> SwissPersona:
+    p = get_engine().sample_persona(preferred_canton, preferred_industry, rng=rng)
+    return enrich_persona(p)
+
+def enrichment_requests(p: SwissPersona, combined: bool = True, variants=None):
+    """
+    Chat requests that enrich ``p``, as keyword dicts for call_openai_chat.
+
+    Combined mode is one JSON request; separate mode is summary then skills.
+    With a VariantPool the prompts are the persona's bucket prompts plus its
+    variant number (see src/generation/variants.py).
+    """
+    if variants is not None:
+        return variants.requests(p, combined)
+    if combined:
+        prompt = build_enrichment_prompt(p)
+        return [{'system_message': prompt['system'], 'user_message': prompt['user'],
+                 'response_format': prompt['response_format']}]
+    return [{'system_message': prompt['system'], 'user_message': prompt['user']}
+            for prompt in (build_summary_prompt(p), build_skills_prompt(p))]
+
+def pending_requests(personas, combined: bool = True, variants=None):
+    """Distinct enrichment requests of ``personas`` that are not cached yet"""
+    if variants is not None:
+        return variants.pending_requests(personas, combined)
+    todo = {}
+    for p in personas:
+        for request in enrichment_requests(p, combined):
+            key = get_cache_key(request['system_message'], request['user_message'])
+            if key not in todo and get_cached_response(key) is None:
+                todo[key] = request
+    return list(todo.values())
+
+def enrich_persona(p: SwissPersona, combined: bool = True, variants=None) -> SwissPersona:
+    """
+    Add summary, skills and job descriptions to an already sampled persona.
+
+    ``combined`` asks for all fields in one JSON request; otherwise summary and
+    skills are two separate plain-text requests (job descriptions unchanged).
+    """
     # Try to generate summary & skills via OpenAI; fall back to simple templates if API not available
-    summary_prompt = build_summary_prompt(p)
-    summary = call_openai_chat(summary_prompt['system'], summary_prompt['user'])
-    if not summary:
-        summary = f"{p.full_name} ist ein/e {p.current_title} mit {int(p.experience_years)} Jahren Erfahrung in {p.industry}."
-    skills_prompt = build_skills_prompt(p)
-    skills_text = call_openai_chat(skills_prompt['system'], skills_prompt['user'])
-    if skills_text:
-        p.skills = [s.strip('- ').strip() for s in skills_text.splitlines() if s.strip()]
-        if not p.skills:
-            p.skills = ['Problem solving','Teamwork']
-    else:
-        # local fallback skills
-        p.skills = ['Problem solving', 'Teamwork', 'Technical knowledge']
-    p.summary = summary
+    texts = [call_openai_chat(**request) for request in enrichment_requests(p, combined, variants)]
+    return apply_responses(p, texts, combined)
+
+def apply_responses(p: SwissPersona, texts, combined: bool = True) -> SwissPersona:
+    """Fill ``p`` from the responses to its enrichment_requests, falling back per field"""
+    if combined:
+        return _apply_combined(p, texts[0])
+    return _apply_enrichment(p, texts[0], _skill_lines(texts[1]))
+
+def _skill_lines(skills_text):
+    if not skills_text:
+        return None
+    return [s.strip('- ').strip() for s in skills_text.splitlines() if s.strip()] or ['Problem solving','Teamwork']
+
+def _apply_combined(p: SwissPersona, text) -> SwissPersona:
+    fields = parse_enrichment_response(text, len(p.career_history))
+    for i, (job, desc) in enumerate(zip(p.career_history, fields['job_descriptions'])):
+        job['desc'] = desc or get_text_engine().job_description(p, i)
+    return _apply_enrichment(p, fields['summary'], fields['skills'])
+
+def _apply_enrichment(p: SwissPersona, summary, skills) -> SwissPersona:
+    # Missing fields come from the offline text engine (same language, seeded per persona)
+    p.summary = summary or get_text_engine().summary(p)
+    p.skills = skills or get_text_engine().skills(p)
     return p
 
+def enrich_persona_offline(p: SwissPersona) -> SwissPersona:
+    """Enrich ``p`` from the offline phrase banks only (no LLM requests)"""
+    return get_text_engine().enrich(p)
+
+async def enrich_persona_async(p: SwissPersona, client=None, semaphore=None, combined: bool = True,
+                               variants=None) -> SwissPersona:
+    """Async enrich_persona; in separate mode the summary and skills requests run concurrently"""
+    texts = await asyncio.gather(*(
+        call_openai_chat_async(**request, client=client, semaphore=semaphore)
+        for request in enrichment_requests(p, combined, variants)
+    ))
+    return apply_responses(p, texts, combined)
+
+async def enrich_personas_async(personas, concurrency: int = 8, combined: bool = True, variants=None):
+    """
+    Enrich many personas with at most ``concurrency`` LLM requests in flight
+    (fewer while the API is throttling).
+
+    Async generator yielding ``(index, persona, error)`` in input order, so
+    output stays stable while requests complete out of order. At most
+    ``2 * concurrency`` personas are in progress at a time, so ``personas``
+    may be a lazy iterable.
+    """
+    # AIMD: start at ``concurrency``, back off on 429s and climb back on success
+    semaphore = AdaptiveConcurrency(concurrency)
+    client = get_async_client()
+    pending = deque()
+    
+    async def finish():
+        i, task = pending.popleft()
+        try:
+            return i, await task, None
+        except Exception as e:
+            return i, None, e
+    
+    try:
+        for i, p in enumerate(personas):
+            pending.append((i, asyncio.ensure_future(enrich_persona_async(p, client, semaphore, combined, variants))))
+            if len(pending) >= 2 * concurrency:
+                yield await finish()
+        while pending:
+            yield await finish()
+    finally:
+        for _, task in pending:
+            task.cancel()
+        # Let cancelled tasks unwind before the loop (and its client) goes away
+        await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+        # Its connection pool would otherwise outlive the loop
+        await aclose_async_client()
 
+async def prefetch_async(requests, concurrency: int = 64, on_done=None) -> int:
+    """
+    Send ``requests`` (enrichment_requests dicts) to fill the response cache,
+    with at most ``concurrency`` in flight. ``on_done`` is called after each.
+    """
+    semaphore = AdaptiveConcurrency(concurrency)
+    client = get_async_client()
+    
+    async def fetch(request):
+        await call_openai_chat_async(**request, client=client, semaphore=semaphore)
+        if on_done is not None:
+            on_done()
+    
+    await asyncio.gather(*(fetch(request) for request in requests))
+    return len(requests)
@@ -0,0 +1,22 @@
+"""Small helpers shared by the data and generation packages"""
+
+import gc
+from contextlib import contextmanager
+
+
+@contextmanager
+def gc_paused():
+    """
+    Pause the cyclic garbage collector for the block.
+
+    For code that allocates many acyclic objects (lists, row dicts), which
+    would otherwise trigger repeated full scans. Restores the previous state
+    even if the block raises.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
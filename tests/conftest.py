@@ -0,0 +1,57 @@
+import importlib.util
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope='session')
+def personas():
+    """A fixed set of offline-enriched personas in all three languages"""
+    from src.generation.offline_text import get_text_engine
+    from src.generation.sampling import get_engine
+
+    engine = get_text_engine()
+    return [engine.enrich(p) for p in get_engine().sample_personas(12, seed=7)]
+
+
+@pytest.fixture
+def response_cache(tmp_path, monkeypatch):
+    """openai_client with an empty response cache and in-flight table of its own"""
+    from src.generation import openai_client
+    from src.generation.llm_cache import MemoryCache, SingleFlight
+
+    monkeypatch.setattr(openai_client, 'CACHE_DB', tmp_path / 'openai.sqlite3')
+    monkeypatch.setattr(openai_client, 'CACHE_DIR', tmp_path / 'openai')
+    monkeypatch.setattr(openai_client, '_cache', None)
+    monkeypatch.setattr(openai_client, 'memory_cache', MemoryCache(10000, 64 * 1024 * 1024))
+    monkeypatch.setattr(openai_client, 'in_flight', SingleFlight())
+    yield openai_client
+    if openai_client._cache is not None:
+        openai_client._cache.close()
+
+
+@pytest.fixture
+def stub_openai(response_cache, monkeypatch):
+    """
+    scripts/stub_openai_server.py on a free local port, with OPENAI_BASE_URL
+    pointing at it. Yields the handler class: set ``latency``, ``max_rps`` and
+    ``retry_after`` on it, read ``requests`` and ``throttled`` afterwards.
+    """
+    spec = importlib.util.spec_from_file_location('stub_openai_server', ROOT / 'scripts' / 'stub_openai_server.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    handler = module.StubHandler
+    handler.latency, handler.jitter, handler.max_rps, handler.retry_after = 0.05, 0.0, 0.0, 0.1
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv('OPENAI_BASE_URL', f'http://127.0.0.1:{server.server_address[1]}/v1')
+    monkeypatch.setenv('OPENAI_API_KEY', 'stub')
+    yield handler
+    server.shutdown()
+    server.server_close()
+    response_cache.close_clients()
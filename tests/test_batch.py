@@ -0,0 +1,41 @@
+import json
+
+from src.generation.batch import (
+    REQUESTS_FILE, complete_persona, ingest_results, load_manifest, load_personas, write_batch,
+)
+from src.generation.sampling import get_engine
+from src.personas.persona_builder import enrichment_requests
+
+
+def output_line(custom_id, summary):
+    content = json.dumps({'summary': summary, 'skills': ['Batch skill'], 'job_descriptions': []})
+    return {'id': f'batch_req_{custom_id[:8]}', 'custom_id': custom_id, 'error': None,
+            'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': content}}]}}}
+
+
+def test_batch_round_trip(tmp_path, response_cache):
+    personas = list(enumerate(get_engine().sample_personas(4, seed=5)))
+    requests = [r for _, p in personas for r in enrichment_requests(p)]
+    manifest = write_batch(str(tmp_path), personas, requests, {'count': 4})
+    assert load_manifest(str(tmp_path))['requests'] == manifest['requests'] == 4
+
+    with open(tmp_path / REQUESTS_FILE, encoding='utf-8') as fh:
+        ids = [json.loads(line)['custom_id'] for line in fh]
+    lines = [
+        output_line(ids[0], 'Summary zero.'),
+        output_line(ids[1], 'Summary one.'),
+        {'custom_id': ids[2], 'response': None, 'error': {'code': 'server_error', 'message': 'boom'}},
+        {'custom_id': ids[3], 'response': {'status_code': 500, 'body': {}}, 'error': None},
+    ]
+    output = tmp_path / 'output.jsonl'
+    output.write_text(''.join(json.dumps(line) + '\n' for line in lines), encoding='utf-8')
+    assert ingest_results(str(output)) == {'stored': 2, 'failed': 2}
+
+    completed = [complete_persona(p) for _, p in load_personas(str(tmp_path))]
+    assert [missing for _, missing in completed] == [0, 0, 1, 1]
+    assert [p.summary for p, _ in completed[:2]] == ['Summary zero.', 'Summary one.']
+    assert all(p.summary for p, _ in completed[2:])
+    assert completed[0][0].skills == ['Batch skill']
+
+    # Only the failed requests are written again
+    assert write_batch(str(tmp_path / 'retry'), personas, requests, {})['requests'] == 2
@@ -0,0 +1,71 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from src.data import bundle
+from src.data.bundle import compile_bundle, load_bundle, load_swiss_data_cached
+from src.data.loader import DATA_FILES, load_swiss_data
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for fname in DATA_FILES:
+        shutil.copy2(os.path.join('data', fname), tmp_path / fname)
+    return str(tmp_path)
+
+
+def summary(data):
+    """Comparable view of a SwissData"""
+    return ({code: c.model_dump() for code, c in data.cantons.items()},
+            {code: o.model_dump() for code, o in data.occupations.items()},
+            data.names, [list(column) for column in data.company_columns],
+            data.canton_codes, data.canton_weights)
+
+
+def test_round_trip(data_dir):
+    compile_bundle(data_dir)
+    assert summary(load_bundle(data_dir)) == summary(load_swiss_data(data_dir))
+
+
+def test_touched_file_with_same_content_still_hits(data_dir):
+    compile_bundle(data_dir)
+    path = os.path.join(data_dir, 'cantons.json')
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert load_bundle(data_dir) is not None
+
+
+def test_same_mtime_is_trusted(data_dir, monkeypatch):
+    compile_bundle(data_dir)
+    monkeypatch.setattr(bundle, 'file_sha256', lambda path: pytest.fail(f'hashed {path}'))
+    assert load_bundle(data_dir) is not None
+
+
+def test_changed_content_misses(data_dir):
+    compile_bundle(data_dir)
+    path = os.path.join(data_dir, 'names_de.csv')
+    st = os.stat(path)
+    with open(path, 'rb') as f:
+        content = f.read()
+    # Same size and mtime would be trusted, so change both content and mtime
+    with open(path, 'wb') as f:
+        f.write(content.replace(b'a', b'e', 1))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert load_bundle(data_dir) is None
+    assert load_bundle(data_dir, check_fresh=False) is not None
+
+
+def test_other_version_misses(data_dir, monkeypatch):
+    compile_bundle(data_dir)
+    monkeypatch.setattr(bundle, 'BUNDLE_VERSION', bundle.BUNDLE_VERSION + 1)
+    assert load_bundle(data_dir) is None
+
+
+def test_cached_load_writes_the_bundle(data_dir):
+    assert load_bundle(data_dir) is None
+    data = load_swiss_data_cached(data_dir)
+    assert summary(load_bundle(data_dir)) == summary(data)
+    with np.load(bundle.bundle_path(data_dir)) as z:
+        assert 'strings' in z.files
@@ -0,0 +1,62 @@
+import pytest
+
+from click.testing import CliRunner
+
+from src.cli.main import cli
+
+
+def run(*args):
+    return CliRunner().invoke(cli, list(args))
+
+
+def test_joint_unknown_canton_is_a_usage_error(tmp_path):
+    result = run('generate', '--count', '2', '--joint', '--canton', 'XX', '--enrich', 'offline',
+                 '--format', 'json', '--output-dir', str(tmp_path))
+    assert result.exit_code == 2
+    assert "no BFS population data for 'XX'" in result.output
+
+
+def test_stratified_unknown_canton_is_a_usage_error(tmp_path):
+    result = run('generate', '--count', '4', '--stratified', '--canton', 'XX', '--enrich', 'offline',
+                 '--format', 'json', '--output-dir', str(tmp_path))
+    assert result.exit_code == 2
+    assert "no canton data for 'XX'" in result.output
+
+
+def test_stratified_known_canton(tmp_path):
+    result = run('generate', '--count', '4', '--stratified', '--canton', 'GE', '--seed', '1', '--enrich', 'offline',
+                 '--format', 'json', '--output-dir', str(tmp_path))
+    assert result.exit_code == 0, result.output
+    assert len(list(tmp_path.glob('*_GE_*.json'))) == 4
+
+
+@pytest.mark.parametrize('joint', [[], ['--joint']])
+def test_shard_matches_slice_of_full_run(tmp_path, joint):
+    full, shard = tmp_path / 'full', tmp_path / 'shard'
+    common = ['--seed', '3', '--enrich', 'offline', '--format', 'json', *joint]
+    assert run('generate', '--count', '12', '--output-dir', str(full), *common).exit_code == 0
+    result = run('generate', '--count', '5', '--start-index', '6', '--output-dir', str(shard), *common)
+    assert result.exit_code == 0, result.output
+    shard_files = sorted(p.name for p in shard.iterdir())
+    assert len(shard_files) == 5
+    for name in shard_files:
+        assert (shard / name).read_bytes() == (full / name).read_bytes()
+
+
+@pytest.mark.parametrize('mode', [[], ['--prompt-mode', 'separate'], ['--variants', '2']])
+def test_warm_cache_serves_the_next_generate(tmp_path, stub_openai, response_cache, mode):
+    options = ['--count', '6', '--seed', '4', *mode]
+    result = run('warm-cache', *options)
+    assert result.exit_code == 0, result.output
+    warmed = stub_openai.requests
+    assert warmed > 0
+    assert f"Cached responses for {warmed} prompts" in result.output
+    assert response_cache.get_cache().stats()['entries'] == warmed
+    assert '0 uncached prompts' in run('warm-cache', *options, '--dry-run').output
+
+    result = run('generate', *options, '--format', 'json', '--output-dir', str(tmp_path))
+    assert result.exit_code == 0, result.output
+    assert stub_openai.requests == warmed
+    files = list(tmp_path.glob('*.json'))
+    assert len(files) == 6
+    assert all('Stub skill' in f.read_text(encoding='utf-8') for f in files)
@@ -0,0 +1,24 @@
+import numpy as np
+
+from src.generation.joint_sampling import _draw
+from src.generation.sampling import get_engine
+
+
+class EdgeGenerator:
+    """Stands in for a Generator whose uniforms land on the top of [0, 1)"""
+
+    def random(self, n):
+        return np.ones(n)
+
+
+def test_draw_never_runs_past_the_table():
+    cum = np.cumsum([0.0, 2.0, 3.0, 0.0, 0.0])
+    assert _draw(cum, np.array([0.0, 0.5, 1.0])).tolist() == [1, 2, 2]
+
+
+def test_sample_at_the_edge_stays_in_range():
+    sampler = get_engine().joint_sampler
+    draws = sampler.sample(5, EdgeGenerator(), cantons=['ZH'], age_range=(20, 30))
+    assert {sampler.cantons[i] for i in draws['canton'].tolist()} == {'ZH'}
+    assert all(20 <= age <= 30 for age in draws['age'].tolist())
+    assert draws['sex'].max() < len(sampler.sexes) and draws['nationality'].max() < len(sampler.nationalities)
@@ -0,0 +1,50 @@
+import sqlite3
+
+from src.generation import llm_cache
+from src.generation.llm_cache import SQLiteCache
+
+
+def stored_hits(path, key):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT hits FROM responses WHERE key = ?', (key,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_hits_are_written_in_batches(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = SQLiteCache(path)
+    cache.set('a', 'response a')
+    for _ in range(3):
+        assert cache.get('a') == 'response a'
+    assert stored_hits(path, 'a') == 0
+    cache.set('b', 'response b')
+    assert stored_hits(path, 'a') == 3
+    cache.get('b')
+    cache.close()
+    assert stored_hits(path, 'b') == 1
+
+
+def test_touches_flush_when_many_are_pending(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, 'TOUCH_FLUSH_AT', 2)
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = SQLiteCache(path)
+    cache.set('a', 'response a')
+    cache.set('b', 'response b')
+    cache.get('a')
+    assert stored_hits(path, 'a') == 0
+    cache.get('b')
+    assert (stored_hits(path, 'a'), stored_hits(path, 'b')) == (1, 1)
+    cache.close()
+
+
+def test_eviction_sees_pending_touches(tmp_path):
+    cache = SQLiteCache(tmp_path / 'cache.sqlite3', max_entries=3)
+    for key in ('old', 'a', 'b'):
+        cache.set(key, key)
+    # Only the buffered touch makes 'old' more recently used than 'a' and 'b'
+    cache.get('old')
+    cache.set('c', 'c')
+    assert [key for key in ('old', 'a', 'b', 'c') if cache.get(key)] == ['old', 'c']
+    cache.close()
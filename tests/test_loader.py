@@ -0,0 +1,24 @@
+import json
+
+import pytest
+
+from src.data.loader import load_cantons, load_swiss_data, normalize_canton
+
+
+def test_canton_weights_follow_cantons_json():
+    data = load_swiss_data('data')
+    weights = dict(zip(data.canton_codes, data.canton_weights))
+    assert weights['ZH'] > weights['BE'] > weights['GE'] > weights['TI']
+    assert weights['BE'] / weights['ZH'] == pytest.approx(0.6)
+
+
+def test_population_wins_over_weight():
+    canton = normalize_canton({'code': 'VD', 'population': 800000, 'weight': 0.1, 'language': 'fr'})
+    assert canton.population == 800000
+
+
+def test_canton_without_code_is_rejected(tmp_path):
+    path = tmp_path / 'cantons.json'
+    path.write_text(json.dumps([{'code': 'ZH', 'name': 'Zürich'}, {'name': 'Nowhere'}]), encoding='utf-8')
+    with pytest.raises(ValueError, match='without a code'):
+        load_cantons(str(path))
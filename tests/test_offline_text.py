@@ -0,0 +1,41 @@
+import copy
+
+import pytest
+
+from src.data.models import Language
+from src.generation.offline_text import OfflineTextEngine, get_text_engine, load_phrase_bank
+from src.generation.sampling import get_engine
+
+LANGUAGES = ['de', 'fr', 'it']
+
+
+def texts(engine, persona):
+    enriched = engine.enrich(copy.deepcopy(persona))
+    return enriched.summary, enriched.skills, [job['desc'] for job in enriched.career_history]
+
+
+@pytest.mark.parametrize('language', LANGUAGES)
+def test_phrase_banks_load(language):
+    bank = load_phrase_bank(language)
+    assert bank['summary']['openers'] and bank['strengths'] and bank['soft_skills']
+
+
+@pytest.mark.parametrize('language', ['fr', 'it'])
+def test_each_language_uses_its_own_bank(language):
+    engine = OfflineTextEngine(get_engine().occupations)
+    persona = get_engine().sample_personas(1, seed=8)[0]
+    german = persona.model_copy(update={'language': Language.de})
+    localized = persona.model_copy(update={'language': Language(language)})
+    assert engine.bank(language) == load_phrase_bank(language) != load_phrase_bank('de')
+    assert engine.summary(localized) != engine.summary(german)
+    assert engine.skills(localized) != engine.skills(german)
+
+
+def test_text_is_deterministic_per_persona():
+    personas = get_engine().sample_personas(30, seed=9)
+    first = [texts(get_text_engine(), p) for p in personas]
+    # Another engine instance, in reverse order
+    other = OfflineTextEngine(get_engine().occupations)
+    assert [texts(other, p) for p in reversed(personas)] == first[::-1]
+    assert len({summary for summary, _, _ in first}) > 1
+    assert [texts(OfflineTextEngine(get_engine().occupations, seed=1), p) for p in personas] != first
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+from src.generation import openai_client
+
+
+def test_concurrent_async_calls_send_one_request(stub_openai):
+    stub_openai.latency = 0.2
+
+    async def run():
+        return await asyncio.gather(*(
+            openai_client.call_openai_chat_async('system', 'same prompt') for _ in range(20)))
+
+    results = asyncio.run(run())
+    assert stub_openai.requests == 1
+    assert len(set(results)) == 1 and results[0]
+
+
+def test_concurrent_threads_send_one_request(stub_openai):
+    stub_openai.latency = 0.2
+    results = []
+    start = threading.Barrier(10)
+
+    def call():
+        start.wait()
+        results.append(openai_client.call_openai_chat('system', 'same prompt'))
+
+    threads = [threading.Thread(target=call) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stub_openai.requests == 1
+    assert len(results) == 10 and len(set(results)) == 1
+
+
+def test_call_after_leader_finished_uses_cache(stub_openai, monkeypatch):
+    first = openai_client.call_openai_chat('system', 'prompt')
+    cached = openai_client.get_cached_response
+    lookups = []
+
+    def missed_first(cache_key, count=True):
+        # As for a caller that checked just before the leader stored its response
+        lookups.append(cache_key)
+        return None if len(lookups) == 1 else cached(cache_key, count)
+
+    monkeypatch.setattr(openai_client, 'get_cached_response', missed_first)
+    assert openai_client.call_openai_chat('system', 'prompt') == first
+    assert stub_openai.requests == 1
+
+
+def test_cold_call_counts_one_miss_per_tier(stub_openai, monkeypatch):
+    from src.generation.llm_cache import TierCounters
+
+    monkeypatch.setattr(openai_client, '_legacy_counters', TierCounters())
+    openai_client.call_openai_chat('system', 'cold prompt')
+    stats = openai_client.cache_stats()
+    for tier in ('memory', 'sqlite', 'legacy'):
+        assert (stats[tier]['hits'], stats[tier]['misses']) == (0, 1), tier
+
+    openai_client.call_openai_chat('system', 'cold prompt')
+    stats = openai_client.cache_stats()
+    assert (stats['memory']['hits'], stats['memory']['misses']) == (1, 1)
+    assert stats['sqlite']['misses'] == stats['legacy']['misses'] == 1
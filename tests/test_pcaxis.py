@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from src.data.pcaxis import PX_CACHE_DIR, load_px, parse_px
+
+PX = '''CHARSET="ANSI";
+LANGUAGE="en";
+STUB="Canton";
+HEADING="Year";
+VALUES("Canton")="Zurich","Bern";
+VALUES("Year")="2022","2023";
+DATA=
+{data};
+'''
+
+
+def write_px(path, data):
+    path.write_text(PX.format(data=data), encoding='utf-8')
+    return str(path)
+
+
+def test_parse_px_shape(tmp_path):
+    cube = parse_px(write_px(tmp_path / 'cube.px', '1 2\n3 ..'))
+    assert cube.values.shape == (2, 2)
+    assert cube.sel(Canton='Bern', Year='2022').values == 3
+
+
+def test_parse_px_rejects_extra_cells(tmp_path):
+    path = write_px(tmp_path / 'cube.px', '1 2\n3 4 5')
+    with pytest.raises(ValueError, match='cube.px'):
+        parse_px(path)
+
+
+def test_load_px_replaces_stale_cache(tmp_path):
+    path = write_px(tmp_path / 'cube.px', '1 2\n3 4')
+    load_px(path)
+    load_px(path, language='en')
+    cache_dir = tmp_path / PX_CACHE_DIR
+    first = set(os.listdir(cache_dir))
+    assert len(first) == 2
+
+    write_px(tmp_path / 'cube.px', '5 6\n7 8')
+    assert load_px(path).values[1, 1] == 8
+    files = set(os.listdir(cache_dir))
+    # The language variant of the old version is left for its own next load
+    assert len(files) == 2 and len(files & first) == 1
+    assert not any(name.endswith('.en.npz') for name in files - first)
@@ -0,0 +1,111 @@
+import base64
+import re
+import zlib
+
+import pytest
+
+from src.export.pdf_renderer_canvas import draw_cv, render_cv_canvas
+
+STREAM_RE = re.compile(rb'<<(.*?)>>\s*stream\r?\n(.*?)endstream', re.S)
+SHOW_RE = re.compile(rb'\(((?:\\.|[^\\)])*)\) Tj')
+
+
+def shown_text(path):
+    """Strings shown by the content streams of a PDF, in stream order"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    strings = []
+    for header, body in STREAM_RE.findall(data):
+        if b'/ASCII85Decode' in header:
+            body = base64.a85decode(body.strip()[:-2])
+        if b'/FlateDecode' in header:
+            body = zlib.decompress(body)
+        strings.extend(SHOW_RE.findall(body))
+    return strings
+
+
+def test_skeleton_keeps_text_order(tmp_path, personas):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    single = []
+    for i, persona in enumerate(personas):
+        path = tmp_path / f'cv_{i}.pdf'
+        render_cv_canvas(persona, str(path))
+        single.extend(shown_text(path))
+    combined = tmp_path / 'all.pdf'
+    c = canvas.Canvas(str(combined), pagesize=A4)
+    for persona in personas:
+        draw_cv(c, persona, skeleton=True)
+    c.save()
+
+    assert shown_text(combined) == single
+    assert combined.read_bytes().count(b'/Subtype /Form') >= 1
+
+
+def test_skeleton_keeps_extracted_text(tmp_path, personas):
+    pymupdf = pytest.importorskip('pymupdf')
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    combined = tmp_path / 'all.pdf'
+    c = canvas.Canvas(str(combined), pagesize=A4)
+    for persona in personas:
+        draw_cv(c, persona, skeleton=True)
+    c.save()
+    document = pymupdf.open(str(combined))
+    for i, persona in enumerate(personas):
+        path = tmp_path / f'cv_{i}.pdf'
+        render_cv_canvas(persona, str(path))
+        assert document[i].get_text() == pymupdf.open(str(path))[0].get_text()
+
+
+def page_count(path):
+    with open(path, 'rb') as f:
+        return len(re.findall(rb'/Type /Page\b(?!s)', f.read()))
+
+
+@pytest.mark.parametrize('skeleton', [False, True])
+def test_document_writer_matches_single_files(tmp_path, personas, skeleton):
+    from src.export.pdf_renderer_canvas import CVDocumentWriter
+
+    single = []
+    for i, persona in enumerate(personas):
+        path = tmp_path / f'cv_{i}.pdf'
+        render_cv_canvas(persona, str(path))
+        single.extend(shown_text(path))
+    with CVDocumentWriter(str(tmp_path), len(personas), skeleton=skeleton) as documents:
+        for i, persona in enumerate(personas):
+            documents.add(persona, i, f'cv_{i}')
+
+    assert shown_text(tmp_path / 'cvs_000000.pdf') == single
+
+
+def test_document_index_page_ranges(tmp_path, personas):
+    import json
+
+    from src.export.pdf_renderer_canvas import CVDocumentWriter
+
+    long_cv = personas[0].model_copy(deep=True)
+    long_cv.summary = ' '.join([long_cv.summary] * 40)
+    batch = [long_cv] + personas
+    with CVDocumentWriter(str(tmp_path), 5) as documents:
+        for i, persona in enumerate(batch, start=100):
+            documents.add(persona, i, f'cv_{i}')
+
+    indexes = sorted(tmp_path.glob('*.index.json'))
+    assert [p.name for p in indexes] == ['cvs_000100.index.json', 'cvs_000105.index.json', 'cvs_000110.index.json']
+    seen = []
+    for index_path in indexes:
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+        assert index['pages'] == page_count(tmp_path / index['pdf'])
+        expected_first = 1
+        for entry in index['cvs']:
+            first, last = entry['pages']
+            assert first == expected_first and last >= first
+            expected_first = last + 1
+            seen.append(entry['index'])
+        assert expected_first - 1 == index['pages']
+    assert seen == list(range(100, 100 + len(batch)))
+    first = json.loads(indexes[0].read_text(encoding='utf-8'))['cvs'][0]
+    assert first['pages'][1] > first['pages'][0]
@@ -0,0 +1,57 @@
+import asyncio
+import hashlib
+
+from src.generation import openai_client
+from src.generation.prompts import build_enrichment_prompt
+from src.generation.sampling import get_engine
+from src.personas.persona_builder import enrich_personas_async
+
+
+def stub_digest(persona):
+    """The digest the stub server puts into the summary it returns for ``persona``"""
+    prompt = build_enrichment_prompt(persona)['user']
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+
+
+def enrich_all(personas, concurrency):
+    async def run():
+        return [item async for item in enrich_personas_async(personas, concurrency=concurrency)]
+    return asyncio.run(run())
+
+
+def test_enrich_personas_async_keeps_input_order(stub_openai):
+    stub_openai.jitter = 0.2
+    personas = get_engine().sample_personas(12, seed=11)
+    digests = [stub_digest(p) for p in personas]
+    results = enrich_all(personas, concurrency=4)
+    assert [i for i, _, _ in results] == list(range(12))
+    assert all(error is None for _, _, error in results)
+    assert [p.summary for _, p, _ in results] == [f"Stub summary {d}." for d in digests]
+
+
+def test_enrich_personas_async_retries_rate_limits(stub_openai, monkeypatch):
+    monkeypatch.setattr(openai_client, 'MAX_ATTEMPTS', 30)
+    stub_openai.max_rps, stub_openai.retry_after = 4, 0.1
+    personas = get_engine().sample_personas(8, seed=12)
+    digests = [stub_digest(p) for p in personas]
+    results = enrich_all(personas, concurrency=8)
+    assert stub_openai.throttled > 0
+    # Personas with identical prompts share one request
+    assert stub_openai.requests == len(set(digests)) + stub_openai.throttled
+    assert [p.summary for _, p, _ in results] == [f"Stub summary {d}." for d in digests]
+
+
+def test_enrich_personas_async_closes_its_client(stub_openai, monkeypatch):
+    from src.personas import persona_builder
+
+    clients = []
+
+    def record_client():
+        clients.append(openai_client.get_async_client())
+        return clients[-1]
+
+    monkeypatch.setattr(persona_builder, 'get_async_client', record_client)
+    results = enrich_all(get_engine().sample_personas(3, seed=13), concurrency=2)
+    assert len(results) == 3
+    assert clients and clients[0].is_closed()
+    assert not openai_client._async_clients
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from src.generation.offline_text import get_text_engine
+from src.generation.prompts import parse_enrichment_response
+from src.generation.sampling import get_engine
+from src.personas.persona_builder import apply_responses
+
+EMPTY = {'summary': None, 'skills': None, 'job_descriptions': [None, None]}
+
+
+def test_parses_all_fields():
+    text = json.dumps({'summary': ' A summary. ', 'skills': ['Python', '- SQL', ''],
+                       'job_descriptions': ['First job.', 'Second job.', 'Extra job.']})
+    assert parse_enrichment_response(text, 2) == {
+        'summary': 'A summary.', 'skills': ['Python', 'SQL'], 'job_descriptions': ['First job.', 'Second job.']}
+
+
+def test_tolerates_fences_prose_and_raw_newlines():
+    text = 'Here you go:\n```json\n{"summary": "Line one\nline two", "skills": "- Python\n- SQL"}\n```\nThanks'
+    result = parse_enrichment_response(text, 1)
+    assert result == {'summary': 'Line one\nline two', 'skills': ['Python', 'SQL'], 'job_descriptions': [None]}
+
+
+@pytest.mark.parametrize('text', [
+    None, '', 'no json here', '{"summary": "unterminated', '{"summary": }', '[1, 2]', '} {',
+])
+def test_malformed_responses_give_empty_fields(text):
+    assert parse_enrichment_response(text, 2) == EMPTY
+
+
+def test_missing_and_invalid_fields_are_none():
+    text = json.dumps({'summary': 42, 'skills': [None, '  '], 'job_descriptions': ['Only one.']})
+    assert parse_enrichment_response(text, 2) == {'summary': None, 'skills': None,
+                                                  'job_descriptions': ['Only one.', None]}
+    assert parse_enrichment_response('{}', 2) == EMPTY
+
+
+def test_missing_fields_fall_back_to_offline_text():
+    persona = get_engine().sample_personas(1, seed=4)[0]
+    persona.career_history.append(dict(persona.career_history[0]))
+    text = json.dumps({'summary': 'From the model.', 'job_descriptions': [None, 'Second from the model.']})
+    enriched = apply_responses(persona, [text])
+    engine = get_text_engine()
+    assert enriched.summary == 'From the model.'
+    assert enriched.skills == engine.skills(enriched)
+    assert [job['desc'] for job in enriched.career_history] == [engine.job_description(enriched, 0),
+                                                                 'Second from the model.']
+
+
+def test_unparseable_response_falls_back_entirely():
+    persona = get_engine().sample_personas(1, seed=4)[0]
+    enriched = apply_responses(persona, ['not json'])
+    engine = get_text_engine()
+    assert (enriched.summary, enriched.skills) == (engine.summary(enriched), engine.skills(enriched))
@@ -0,0 +1,39 @@
+import pytest
+
+from src.generation.quotas import default_canton_shares, generate_stratified, plan_quotas, quota_report
+from src.generation.sampling import get_engine
+
+SHARES = {'ZH': 0.45, 'BE': 0.30, 'GE': 0.15, 'TI': 0.10}
+
+
+def test_planned_marginals_match_shares():
+    plan = plan_quotas(10_000, SHARES, {'male': 0.5, 'female': 0.5})
+    for dim, value, share, count in plan.targets():
+        given = SHARES[value] if dim == 'canton' else 0.5
+        assert share == given
+        assert count == round(10_000 * given)
+    assert sum(plan.cells.values()) == 10_000
+
+
+def test_shares_must_sum_to_one():
+    with pytest.raises(ValueError, match='sum to 0.399'):
+        plan_quotas(1000, {'ZH': 0.179, 'BE': 0.121, 'GE': 0.058, 'TI': 0.041})
+    with pytest.raises(ValueError, match='Gender'):
+        plan_quotas(1000, SHARES, {'male': 0.5})
+
+
+def test_report_targets_are_the_given_shares():
+    engine = get_engine()
+    plan = plan_quotas(200, SHARES)
+    report = quota_report(plan, generate_stratified(engine, plan, seed=1, as_dict=True))
+    for row in report:
+        assert row['achieved_count'] == row['target_count']
+        if row['dimension'] == 'canton':
+            assert row['target_share'] == SHARES[row['value']]
+            assert row['achieved_share'] == SHARES[row['value']]
+
+
+def test_default_shares_sum_to_one():
+    shares = default_canton_shares(get_engine())
+    assert sum(shares.values()) == pytest.approx(1)
+    assert default_canton_shares(get_engine(), cantons=['GE']) == {'GE': 1.0}
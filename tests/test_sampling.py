@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.data.models import SwissPersona
+from src.generation.sampling import WeightedTable, get_engine, weighted_choice
+from src.generation.seeding import persona_seed
+
+
+@pytest.mark.parametrize('joint', [False, True])
+def test_objects_match_validated_rows(joint):
+    engine = get_engine()
+    rows = engine.sample_personas(500, seed=21, as_dict=True, joint=joint)
+    personas = engine.sample_personas(500, seed=21, joint=joint)
+    for row, persona in zip(rows, personas):
+        validated = SwissPersona(**row)
+        assert persona == validated
+        assert {k: type(v) for k, v in persona} == {k: type(v) for k, v in validated}
+        assert persona.model_dump_json() == validated.model_dump_json()
+
+
+@pytest.mark.parametrize('joint', [False, True])
+def test_range_matches_slice_of_full_run(joint):
+    engine = get_engine()
+    full = engine.sample_personas_range(0, 8300, seed=99, as_dict=True, joint=joint)
+    # Shards inside one block, across the 4096 boundary and into the third block
+    for start, stop in ((10, 40), (4000, 4200), (8190, 8300)):
+        assert engine.sample_personas_range(start, stop, seed=99, as_dict=True, joint=joint) == full[start:stop]
+
+
+def test_sample_persona_at_is_stable():
+    engine = get_engine()
+    for index in (0, 4095, 4096, 123_456):
+        first = engine.sample_persona_at(5, index)
+        engine.sample_persona_at(5, index + 1)
+        assert engine.sample_persona_at(5, index) == first
+    assert engine.sample_persona_at(5, 4095) != engine.sample_persona_at(5, 4096)
+    assert engine.sample_persona_at(5, 4096) != engine.sample_persona_at(6, 4096)
+
+
+def test_persona_seed_matches_spawn():
+    children = np.random.SeedSequence(5).spawn(10)
+    for index in (0, 9):
+        assert persona_seed(5, index).generate_state(4).tolist() == children[index].generate_state(4).tolist()
+
+
+@pytest.mark.parametrize('weights', [
+    [5, 30, 150, 500, 30],
+    [1],
+    [0, 2, 0, 0, 3, 0],
+    [0, 0, 0],
+])
+def test_weighted_table_matches_weighted_choice(weights):
+    items = [f"item{i}" for i in range(len(weights))]
+    table = WeightedTable(items, weights)
+    state = random.getstate()
+    try:
+        for seed in range(500):
+            random.seed(seed)
+            expected = [weighted_choice(items, weights) for _ in range(5)]
+            random.seed(seed)
+            assert [table.sample() for _ in range(5)] == expected
+    finally:
+        random.setstate(state)
+
+
+def test_weighted_table_skips_zero_weights():
+    table = WeightedTable(['a', 'b', 'c', 'd'], [0, 2, 0, 3])
+    counts = np.bincount(table.sample_indices(np.random.default_rng(0), 10_000), minlength=4)
+    assert counts[0] == counts[2] == 0
+    assert counts[1] + counts[3] == 10_000
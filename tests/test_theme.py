@@ -0,0 +1,38 @@
+import pytest
+
+from src.data.models import Language
+from src.export.theme import get_theme
+from src.export.to_pdf import classic_content
+from src.generation.sampling import get_engine
+
+
+def sections(column):
+    return [item[1] for item in column if isinstance(item, tuple) and item[0] == 'section']
+
+
+def test_german_labels_are_unchanged():
+    # The labels both renderers printed for every CV before themes were per language
+    classic = get_theme('de', 'classic').labels
+    assert [classic[k] for k in ('contact', 'languages', 'skills', 'profile', 'experience', 'education')] == [
+        'KONTAKT', 'SPRACHEN', 'KOMPETENZEN', 'PROFESSIONELLES PROFIL', 'BERUFSERFAHRUNG', 'AUSBILDUNG']
+    refined = get_theme('de', 'refined').labels
+    assert (refined['age'], refined['photo'], refined['generated']) == ('{age} Jahre', 'Foto', 'Generiert: {timestamp}')
+
+
+@pytest.mark.parametrize('language, contact, age', [
+    ('de', 'KONTAKT', 'Jahre'),
+    ('fr', 'CONTACT', 'ans'),
+    ('it', 'CONTATTO', 'anni'),
+])
+def test_classic_labels_follow_the_cv_language(language, contact, age):
+    persona = get_engine().sample_personas(1, seed=2)[0].model_copy(update={'language': Language(language)})
+    _, left, _ = classic_content(persona)
+    assert sections(left)[0] == contact
+    assert ('normal', f"{persona.age} {age}") in left
+
+
+@pytest.mark.parametrize('language', ['fr', 'it'])
+def test_refined_labels_are_localized(language):
+    labels = get_theme(language, 'refined').labels
+    assert labels['age'] != '{age} Jahre'
+    assert not labels['generated'].startswith('Generiert')
@@ -0,0 +1,24 @@
+import gc
+
+import pytest
+
+from src.utils import gc_paused
+
+
+def test_gc_paused_restores_state_on_error():
+    assert gc.isenabled()
+    with pytest.raises(RuntimeError):
+        with gc_paused():
+            assert not gc.isenabled()
+            raise RuntimeError('boom')
+    assert gc.isenabled()
+
+
+def test_gc_paused_keeps_gc_off_if_it_was():
+    gc.disable()
+    try:
+        with gc_paused():
+            pass
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
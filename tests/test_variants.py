@@ -0,0 +1,73 @@
+from collections import Counter
+
+import pytest
+
+from src.generation.batch import request_key
+from src.generation.sampling import get_engine
+from src.generation.variants import VariantPool, experience_label, parse_experience_bins
+from src.personas.persona_builder import enrich_persona
+
+BINS = parse_experience_bins('0-2,3-6,7-14,15+')
+
+
+def persona(seed=1, **update):
+    return get_engine().sample_personas(1, seed=seed)[0].model_copy(update=update)
+
+
+def test_experience_bins():
+    assert BINS == ((0, 2), (3, 6), (7, 14), (15, None))
+    assert [experience_label(y, BINS) for y in (0, 2.9, 3, 6, 14, 40)] == ['0–2', '0–2', '3–6', '3–6', '7–14', '15+']
+    assert experience_label(1, ((3, 6),)) == '1'
+    with pytest.raises(ValueError):
+        parse_experience_bins(' , ')
+
+
+def test_bucket_ignores_identity_and_bins_experience():
+    pool = VariantPool(3, BINS)
+    base = persona(experience_years=3)
+    other = persona(seed=2, language=base.language, current_title=base.current_title, canton=base.canton,
+                    industry=base.industry, experience_years=6)
+    assert other.full_name != base.full_name
+    assert pool.bucket(other) == pool.bucket(base)
+    assert pool.bucket(base.model_copy(update={'experience_years': 7})) != pool.bucket(base)
+    assert pool.bucket(base.model_copy(update={'canton': 'TI'})) != pool.bucket(base)
+    # Same bucket and variant: same prompt and cache key, whoever the persona is
+    assert [request_key(r) for r in pool.requests(other, variant=1)] == \
+        [request_key(r) for r in pool.requests(base, variant=1)]
+    assert request_key(pool.requests(base, variant=0)[0]) != request_key(pool.requests(base, variant=1)[0])
+
+
+def test_variant_is_stable_and_spread():
+    pool = VariantPool(4)
+    personas = get_engine().sample_personas(400, seed=3)
+    again = get_engine().sample_personas(400, seed=3)
+    assert [pool.variant(p) for p in personas] == [pool.variant(p) for p in again]
+    assert set(Counter(pool.variant(p) for p in personas)) == {0, 1, 2, 3}
+    assert {VariantPool(1).variant(p) for p in personas} == {0}
+    with pytest.raises(ValueError):
+        VariantPool(0)
+
+
+@pytest.mark.parametrize('combined, per_variant', [(True, 1), (False, 2)])
+def test_pool_size_is_buckets_times_k(response_cache, combined, per_variant):
+    pool = VariantPool(3, BINS)
+    personas = get_engine().sample_personas(300, seed=5)
+    buckets = {pool.bucket(p) for p in personas}
+    assert len(buckets) < len(personas)
+    pending = pool.pending_requests(personas, combined)
+    if combined:
+        assert len(pending) == len(buckets) * 3
+    else:
+        # Skills prompts leave out the canton, so buckets share them
+        assert len(buckets) * 3 < len(pending) <= len(buckets) * 3 * per_variant
+
+
+def test_pregenerated_pool_serves_every_persona(stub_openai):
+    pool = VariantPool(2, BINS)
+    personas = get_engine().sample_personas(60, seed=6)
+    generated = pool.pregenerate(personas, concurrency=8)
+    assert generated == len({pool.bucket(p) for p in personas}) * 2 == stub_openai.requests
+    summaries = {enrich_persona(p, variants=pool).summary for p in personas}
+    assert stub_openai.requests == generated
+    assert len(summaries) <= generated
+    assert pool.pending_requests(personas) == []